@@ -28,7 +28,7 @@ router.post('/signup', async (req, res) => {
         await user.save();
 
         const token = jwt.sign(
-            { userId: user._id, email: user.email, name: user.name },
+            { userId: user._id, email: user.email, name: user.name, plan: user.plan },
             JWT_SECRET,
             { expiresIn: '14d' }
         );
@@ -63,7 +63,7 @@ router.post('/login', async (req, res) => {
         }
 
         const token = jwt.sign(
-            { userId: user._id, email: user.email, name: user.name },
+            { userId: user._id, email: user.email, name: user.name, plan: user.plan },
             JWT_SECRET,
             { expiresIn: '7d' }
         );
@@ -5,10 +5,14 @@ const auth = require('../middleware/auth');
 const router = express.Router();
 const ML_ENGINE_URL = process.env.ML_ENGINE_URL || 'http://localhost:5001';
 
+// Runs may wait in the engine's queue (FLOWML_MAX_QUEUE_WAIT, shed with a 429
+// after that) before their 30s execution; keep this in sync with the engine.
+const ENGINE_QUEUE_WAIT_MS = (Number(process.env.FLOWML_MAX_QUEUE_WAIT) || 60) * 1000;
+
 // POST /api/execute – Execute pipeline via Python ML engine
 router.post('/', auth, async (req, res) => {
     try {
-        const { nodes, edges, uploaded_files } = req.body;
+        const { nodes, edges, uploaded_files, preview, preview_rows } = req.body;
 
         if (!nodes || !Array.isArray(nodes) || nodes.length === 0) {
             return res.status(400).json({ error: 'Pipeline must have at least one node.' });
@@ -25,14 +29,24 @@ router.post('/', auth, async (req, res) => {
         const response = await axios.post(`${ML_ENGINE_URL}/execute-pipeline`, {
             nodes,
             edges,
-            uploaded_files
+            uploaded_files,
+            user_id: req.user?.userId,
+            tier: req.user?.plan || 'free',
+            priority: 'interactive',
+            preview: Boolean(preview),
+            preview_rows
         }, {
-            timeout: 35000  // 35s (buffer over the 30s execution timeout)
+            timeout: ENGINE_QUEUE_WAIT_MS + 35000  // queue wait + 30s execution + buffer
         });
 
         res.json(response.data);
     } catch (err) {
         if (err.response) {
+            // 429 from the engine's scheduler: pass the retry hint through
+            if (err.response.status === 429) {
+                res.set('Retry-After', err.response.headers['retry-after'] || '5');
+                return res.status(429).json({ error: err.response.data?.detail || 'ML engine is busy. Try again shortly.' });
+            }
             return res.status(err.response.status).json(err.response.data);
         }
         console.error('Execution error:', err.message);
@@ -43,6 +57,75 @@ router.post('/', auth, async (req, res) => {
     }
 });
 
+// GET /api/execute/results/:jobId – Full-data result of a preview run
+router.get('/results/:jobId', auth, async (req, res) => {
+    try {
+        const response = await axios.get(`${ML_ENGINE_URL}/pipeline-results/${req.params.jobId}`);
+        res.json(response.data);
+    } catch (err) {
+        if (err.response) {
+            return res.status(err.response.status).json(err.response.data);
+        }
+        console.error('Result fetch error:', err.message);
+        res.status(500).json({ error: 'Failed to fetch pipeline results. Is the ML engine running?' });
+    }
+});
+
+// POST /api/execute/batch – Execute one pipeline over many dataset/config bindings
+router.post('/batch', auth, async (req, res) => {
+    try {
+        const { nodes, edges, uploaded_files, bindings, max_parallel } = req.body;
+
+        if (!nodes || !Array.isArray(nodes) || nodes.length === 0) {
+            return res.status(400).json({ error: 'Pipeline must have at least one node.' });
+        }
+        if (!bindings || !Array.isArray(bindings) || bindings.length === 0) {
+            return res.status(400).json({ error: 'Batch must contain at least one binding.' });
+        }
+
+        const response = await axios.post(`${ML_ENGINE_URL}/execute-pipeline-batch`, {
+            nodes,
+            edges,
+            uploaded_files,
+            user_id: req.user?.userId,
+            tier: req.user?.plan || 'free',
+            bindings,
+            max_parallel
+        }, {
+            timeout: ENGINE_QUEUE_WAIT_MS + 600000  // queue wait + many 30s instances
+        });
+
+        res.json(response.data);
+    } catch (err) {
+        if (err.response) {
+            // 429 from the engine's scheduler: pass the retry hint through
+            if (err.response.status === 429) {
+                res.set('Retry-After', err.response.headers['retry-after'] || '5');
+                return res.status(429).json({ error: err.response.data?.detail || 'ML engine is busy. Try again shortly.' });
+            }
+            return res.status(err.response.status).json(err.response.data);
+        }
+        console.error('Batch execution error:', err.message);
+        res.status(500).json({
+            error: 'Failed to execute pipeline batch. Is the ML engine running?',
+            details: err.message
+        });
+    }
+});
+
+// GET /api/execute/queue – Engine load and the caller's queued runs
+router.get('/queue', auth, async (req, res) => {
+    try {
+        const response = await axios.get(`${ML_ENGINE_URL}/queue`, {
+            params: { user_id: req.user?.userId }
+        });
+        res.json(response.data);
+    } catch (err) {
+        console.error('Queue status error:', err.message);
+        res.status(500).json({ error: 'Failed to fetch queue status. Is the ML engine running?' });
+    }
+});
+
 // GET /api/execute/download-model/:id – Proxy model download
 router.get('/download-model/:id', async (req, res) => {
     try {
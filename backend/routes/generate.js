@@ -80,6 +80,7 @@ const NODE_METADATA = {
     train_test_split: { label: 'Data Splitter', category: 'prep', inputs: ['dataframe'], outputs: ['train_data', 'test_data'] },
     linear_regression: { label: 'Linear Model', category: 'model', inputs: ['train_data'], outputs: ['model'] },
     random_forest: { label: 'Random Forest', category: 'model', inputs: ['train_data'], outputs: ['model'] },
+    sgd_linear: { label: 'SGD Linear Model', category: 'model', inputs: ['train_data'], outputs: ['model'] },
     accuracy: { label: 'Model Evaluator', category: 'eval', inputs: ['model', 'test_data'], outputs: ['metrics'] },
     model_comparison: { label: 'Model Comparison', category: 'eval', inputs: ['metrics'], outputs: ['comparison_result'] }
 };
@@ -241,7 +242,13 @@ function buildReactFlowGraph(pipelineInfo) {
 
         const evalIds = [];
 
-        validModels.forEach((modelType, idx) => {
+        // Linear regression can't be ranked against a classifier, so
+        // classification comparisons use the SGD linear classifier instead
+        const branchModels = validModels.map(m =>
+            intent.problem_type === 'classification' && m === 'linear_regression' ? 'sgd_linear' : m
+        );
+
+        branchModels.forEach((modelType, idx) => {
             const branchX = startX + (idx * branchSpacing);
             const branchY = currentY;
 
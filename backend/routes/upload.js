@@ -1,25 +1,14 @@
 const express = require('express');
 const multer = require('multer');
-const path = require('path');
-const fs = require('fs');
+const axios = require('axios');
 const auth = require('../middleware/auth');
 
 const router = express.Router();
+const ML_ENGINE_URL = process.env.ML_ENGINE_URL || 'http://localhost:5001';
 
-// Ensure uploads directory exists
-const uploadDir = path.join(__dirname, '..', 'uploads');
-if (!fs.existsSync(uploadDir)) {
-    fs.mkdirSync(uploadDir, { recursive: true });
-}
-
-// Multer config
-const storage = multer.diskStorage({
-    destination: (req, file, cb) => cb(null, uploadDir),
-    filename: (req, file, cb) => {
-        const uniqueName = `${Date.now()}-${file.originalname}`;
-        cb(null, uniqueName);
-    }
-});
+// Files are kept in memory and handed to the ML engine, which stores them
+// deduplicated and namespaced per user in its upload index.
+const storage = multer.memoryStorage();
 
 const upload = multer({
     storage,
@@ -33,18 +22,28 @@ const upload = multer({
     }
 });
 
-// POST /api/upload – Upload CSV file
-router.post('/', auth, upload.single('file'), (req, res) => {
+// POST /api/upload – Upload CSV file to the ML engine's upload index
+router.post('/', auth, upload.single('file'), async (req, res) => {
     if (!req.file) {
         return res.status(400).json({ error: 'No file uploaded.' });
     }
 
-    res.json({
-        fileId: req.file.filename,
-        fileName: req.file.originalname,
-        sizeMB: (req.file.size / (1024 * 1024)).toFixed(2),
-        path: req.file.path
-    });
+    try {
+        const form = new FormData();
+        form.append('file', new Blob([req.file.buffer], { type: 'text/csv' }), req.file.originalname);
+
+        const response = await axios.post(`${ML_ENGINE_URL}/upload`, form, {
+            headers: { 'X-User-Id': req.user?.userId || '' }
+        });
+
+        res.json(response.data);
+    } catch (err) {
+        if (err.response) {
+            return res.status(err.response.status).json({ error: err.response.data?.detail || 'Upload failed.' });
+        }
+        console.error('Upload error:', err.message);
+        res.status(500).json({ error: 'Failed to upload file. Is the ML engine running?' });
+    }
 });
 
 // Error handler for multer
@@ -2,6 +2,18 @@ import { BarChart, Bar, LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, R
 import { motion } from 'framer-motion';
 import { Trophy, Medal, TrendingUp } from 'lucide-react';
 
+const METRIC_LABELS = {
+    r2_score: 'R² Score',
+    rmse: 'RMSE',
+    mae: 'MAE',
+    accuracy: 'Accuracy',
+    precision: 'Precision',
+    recall: 'Recall',
+    f1: 'F1 (Macro)',
+    log_loss: 'Log Loss',
+    roc_auc: 'ROC-AUC'
+};
+
 export default function MetricsDashboard({ results }) {
     if (!results || Object.keys(results).length === 0) {
         return (
@@ -14,7 +26,7 @@ export default function MetricsDashboard({ results }) {
 
     // Extract metrics, chart data, and comparison results
     let metrics = {};
-    let chartData = { predictions: [], feature_importance: [], model_comparison: [] };
+    let chartData = { predictions: [], confusion_matrix: [], feature_importance: [], model_comparison: [] };
     let comparisonResult = null;
 
     Object.entries(results).forEach(([key, value]) => {
@@ -28,15 +40,33 @@ export default function MetricsDashboard({ results }) {
     });
 
     const isComparison = comparisonResult !== null;
+    const isClassification = (comparisonResult?.problem_type || metrics.problem_type) === 'classification';
+    const comparisonLabel = METRIC_LABELS[comparisonResult?.comparison_metric] || 'Score';
+    const rankingColumns = isClassification
+        ? ['accuracy', 'f1', 'roc_auc']
+        : ['r2_score', 'rmse', 'mae'];
+
+    // Confusion matrix cells arrive flat as {actual, predicted, count}
+    const confusionLabels = [...new Set((chartData.confusion_matrix || []).map(c => c.actual))];
+    const confusionCounts = Object.fromEntries(
+        (chartData.confusion_matrix || []).map(c => [`${c.actual}|${c.predicted}`, c.count])
+    );
+    const confusionMax = Math.max(1, ...(chartData.confusion_matrix || []).map(c => c.count));
 
     // Standard metric cards (for single-model or comparison summary)
     const metricCards = isComparison
         ? [
             { label: 'Best Model', value: comparisonResult.best_model?.replace(/_/g, ' ').toUpperCase(), color: '#2563eb' },
-            { label: 'Best R² Score', value: comparisonResult.best_score, color: '#16a34a' },
+            { label: `Best ${comparisonLabel}`, value: comparisonResult.best_score, color: '#16a34a' },
             { label: 'Models Compared', value: comparisonResult.total_models, color: '#8b5cf6' },
             { label: 'Problem Type', value: comparisonResult.problem_type?.toUpperCase(), color: '#0891b2' },
         ].filter(m => m.value !== undefined)
+        : isClassification ? [
+            { label: 'Accuracy', value: metrics.accuracy, color: '#2563eb' },
+            { label: 'F1 (Macro)', value: metrics.f1, color: '#0891b2' },
+            { label: 'ROC-AUC', value: metrics.roc_auc ?? undefined, color: '#ca8a04' },
+            { label: 'Evaluation Samples', value: metrics.test_samples, color: '#16a34a' },
+        ].filter(m => m.value !== undefined)
         : [
             { label: 'R² Core Accuracy', value: metrics.r2_score, color: '#2563eb' },
             { label: 'RMS Error (RMSE)', value: metrics.rmse, color: '#0891b2' },
@@ -96,9 +126,9 @@ export default function MetricsDashboard({ results }) {
                                 <tr className="bg-[#f8fafc] border-b border-black/5">
                                     <th className="px-5 py-3 text-[10px] font-bold text-[#64748b] uppercase tracking-wider">Rank</th>
                                     <th className="px-5 py-3 text-[10px] font-bold text-[#64748b] uppercase tracking-wider">Model</th>
-                                    <th className="px-5 py-3 text-[10px] font-bold text-[#64748b] uppercase tracking-wider text-right">R² Score</th>
-                                    <th className="px-5 py-3 text-[10px] font-bold text-[#64748b] uppercase tracking-wider text-right">RMSE</th>
-                                    <th className="px-5 py-3 text-[10px] font-bold text-[#64748b] uppercase tracking-wider text-right">MAE</th>
+                                    {rankingColumns.map(col => (
+                                        <th key={col} className="px-5 py-3 text-[10px] font-bold text-[#64748b] uppercase tracking-wider text-right">{METRIC_LABELS[col]}</th>
+                                    ))}
                                     <th className="px-5 py-3 text-[10px] font-bold text-[#64748b] uppercase tracking-wider text-right">Samples</th>
                                     <th className="px-5 py-3 text-[10px] font-bold text-[#64748b] uppercase tracking-wider text-center">Status</th>
                                 </tr>
@@ -133,17 +163,17 @@ export default function MetricsDashboard({ results }) {
                                                 {r.model?.replace(/_/g, ' ').replace(/\b\w/g, l => l.toUpperCase())}
                                             </span>
                                         </td>
-                                        <td className="px-5 py-4 text-right">
-                                            <span className={`text-[13px] font-bold tabular-nums ${r.is_best ? 'text-[#16a34a]' : 'text-[#475569]'}`}>
-                                                {r.r2_score?.toFixed(4)}
-                                            </span>
-                                        </td>
-                                        <td className="px-5 py-4 text-right">
-                                            <span className="text-[13px] font-medium text-[#64748b] tabular-nums">{r.rmse?.toFixed(4)}</span>
-                                        </td>
-                                        <td className="px-5 py-4 text-right">
-                                            <span className="text-[13px] font-medium text-[#64748b] tabular-nums">{r.mae?.toFixed(4)}</span>
-                                        </td>
+                                        {rankingColumns.map(col => (
+                                            <td key={col} className="px-5 py-4 text-right">
+                                                {col === comparisonResult.comparison_metric ? (
+                                                    <span className={`text-[13px] font-bold tabular-nums ${r.is_best ? 'text-[#16a34a]' : 'text-[#475569]'}`}>
+                                                        {r[col]?.toFixed(4)}
+                                                    </span>
+                                                ) : (
+                                                    <span className="text-[13px] font-medium text-[#64748b] tabular-nums">{r[col]?.toFixed(4)}</span>
+                                                )}
+                                            </td>
+                                        ))}
                                         <td className="px-5 py-4 text-right">
                                             <span className="text-[13px] font-medium text-[#64748b] tabular-nums">{r.test_samples}</span>
                                         </td>
@@ -178,7 +208,7 @@ export default function MetricsDashboard({ results }) {
                 >
                     <h4 className="text-[11px] font-bold text-[#475569] uppercase tracking-[0.2em] mb-6 flex items-center gap-2">
                         <div className="w-1.5 h-1.5 rounded-full bg-[#2563eb]" />
-                        R² Score Comparison
+                        {comparisonLabel} Comparison
                     </h4>
                     <div className="h-[calc(100%-40px)]">
                         <ResponsiveContainer width="100%" height="100%">
@@ -199,9 +229,9 @@ export default function MetricsDashboard({ results }) {
                                 />
                                 <Tooltip
                                     contentStyle={{ background: '#ffffff', border: '1px solid rgba(0,0,0,0.05)', borderRadius: '12px', fontSize: '11px', boxShadow: '0 10px 30px rgba(0,0,0,0.08)' }}
-                                    formatter={(value) => [value?.toFixed(4), 'R² Score']}
+                                    formatter={(value) => [value?.toFixed(4), comparisonLabel]}
                                 />
-                                <Bar dataKey="r2_score" radius={[6, 6, 0, 0]} barSize={60}>
+                                <Bar dataKey="score" radius={[6, 6, 0, 0]} barSize={60}>
                                     {chartData.model_comparison.map((entry, index) => (
                                         <Cell
                                             key={`cell-${index}`}
@@ -259,6 +289,56 @@ export default function MetricsDashboard({ results }) {
                     </div>
                 )}
 
+                {/* Confusion Matrix (classification) */}
+                {confusionLabels.length > 0 && (
+                    <div className="bg-[#ffffff] rounded-2xl border border-black/5 p-6 shadow-xl flex flex-col">
+                        <div className="flex items-center justify-between mb-6">
+                            <h4 className="text-[11px] font-bold text-[#475569] uppercase tracking-[0.2em] flex items-center gap-2">
+                                <div className="w-1.5 h-1.5 rounded-full bg-[#2563eb]" />
+                                Confusion Matrix
+                            </h4>
+                            <span className="text-[9px] font-bold text-[#94a3b8] uppercase tracking-wider">Rows: Actual · Columns: Predicted</span>
+                        </div>
+                        <div className="flex-1 overflow-auto">
+                            <table className="w-full h-full border-separate border-spacing-1">
+                                <thead>
+                                    <tr>
+                                        <th />
+                                        {confusionLabels.map(label => (
+                                            <th key={label} className="text-[10px] font-bold text-[#64748b] text-center truncate">{label}</th>
+                                        ))}
+                                    </tr>
+                                </thead>
+                                <tbody>
+                                    {confusionLabels.map(actual => (
+                                        <tr key={actual}>
+                                            <th className="text-[10px] font-bold text-[#64748b] text-right pr-2 truncate">{actual}</th>
+                                            {confusionLabels.map(predicted => {
+                                                const count = confusionCounts[`${actual}|${predicted}`] || 0;
+                                                const correct = actual === predicted;
+                                                return (
+                                                    <td
+                                                        key={predicted}
+                                                        className="rounded-md text-center text-[12px] font-bold tabular-nums"
+                                                        style={{
+                                                            backgroundColor: correct
+                                                                ? `rgba(37, 99, 235, ${0.08 + 0.72 * count / confusionMax})`
+                                                                : `rgba(220, 38, 38, ${count ? 0.08 + 0.5 * count / confusionMax : 0.03})`,
+                                                            color: correct && count / confusionMax > 0.5 ? '#ffffff' : '#0f172a'
+                                                        }}
+                                                    >
+                                                        {count}
+                                                    </td>
+                                                );
+                                            })}
+                                        </tr>
+                                    ))}
+                                </tbody>
+                            </table>
+                        </div>
+                    </div>
+                )}
+
                 {/* Feature Importance */}
                 {chartData.feature_importance && chartData.feature_importance.length > 0 && (
                     <div className="bg-[#ffffff] rounded-2xl border border-black/5 p-6 shadow-xl flex flex-col">
@@ -1,9 +1,12 @@
-import { createContext, useContext, useState, useCallback } from 'react';
+import { createContext, useContext, useState, useCallback, useRef } from 'react';
 import { applyNodeChanges, applyEdgeChanges } from '@xyflow/react';
 import { executeAPI, pipelineAPI, uploadAPI } from '../utils/api';
 
 const PipelineContext = createContext(null);
 
+// How long the canvas waits for the full-data result of a preview run
+const MAX_RESULT_POLL_MS = 5 * 60 * 1000;
+
 export function PipelineProvider({ children }) {
     const [nodes, setNodes] = useState([]);
     const [edges, setEdges] = useState([]);
@@ -19,6 +22,8 @@ export function PipelineProvider({ children }) {
     const [modelDownloadAvailable, setModelDownloadAvailable] = useState(false);
     const [modelFileId, setModelFileId] = useState(null);
     const [hasDismissedOnboarding, setHasDismissedOnboarding] = useState(false);
+    // Bumped on every run, load and clear; results of an older run are dropped
+    const runTokenRef = useRef(0);
 
     // Cascade edge cleanup when nodes are removed - prevents orphan edges
     const onNodesChange = useCallback(
@@ -100,6 +105,9 @@ export function PipelineProvider({ children }) {
     const runPipeline = useCallback(async () => {
         if (nodes.length === 0) return;
 
+        const runToken = ++runTokenRef.current;
+        const isStale = () => runTokenRef.current !== runToken;
+
         setExecutionState('running');
         setLogs([{ time: new Date().toLocaleTimeString(), type: 'info', message: 'Initializing enterprise execution engine...' }]);
         setResults(null);
@@ -107,10 +115,7 @@ export function PipelineProvider({ children }) {
         // Reset node statuses
         setNodes(nds => nds.map(n => ({ ...n, data: { ...n.data, status: 'running', error: null } })));
 
-        try {
-            const res = await executeAPI.run(nodes, edges, uploadedFiles);
-            const data = res.data;
-
+        const applyRunResult = (data) => {
             // Update individual node statuses based on results
             setNodes(nds => nds.map(n => {
                 const nodeRes = data.node_states?.[n.id];
@@ -118,7 +123,8 @@ export function PipelineProvider({ children }) {
                     ...n,
                     data: {
                         ...n.data,
-                        status: nodeRes || 'success',
+                        // A failed run that never reached a node leaves it idle
+                        status: nodeRes || (data.success ? 'success' : 'idle'),
                         error: data.errors?.[n.id] || null
                     }
                 };
@@ -130,10 +136,14 @@ export function PipelineProvider({ children }) {
                 type: l.level === 'error' ? 'error' : l.level === 'success' ? 'success' : 'info',
                 message: l.message
             }));
+            if (!data.success && data.error && formattedLogs.length === 0) {
+                formattedLogs.push({ time: new Date().toLocaleTimeString(), type: 'error', message: data.error });
+            }
 
             setLogs(formattedLogs);
             setResults(data.results || null);
-            setExecutionState(data.success ? 'completed' : 'failed');
+            // Provisional results keep the run active until the full-data run lands
+            setExecutionState(!data.success ? 'failed' : data.provisional ? 'running' : 'completed');
 
             if (data.model_download_available) {
                 setModelDownloadAvailable(true);
@@ -142,9 +152,39 @@ export function PipelineProvider({ children }) {
                 setModelDownloadAvailable(false);
                 setModelFileId(null);
             }
+        };
+
+        try {
+            // Preview mode: provisional results on a sample, full results follow
+            const res = await executeAPI.run(nodes, edges, uploadedFiles, { preview: true });
+            let data = res.data;
+            if (isStale()) return null;
+            applyRunResult(data);
+
+            if (data.provisional && data.job_id) {
+                setLogs(prev => [...prev, { time: new Date().toLocaleTimeString(), type: 'info', message: 'Preview results shown. Running on the full dataset...' }]);
+                const deadline = Date.now() + MAX_RESULT_POLL_MS;
+                for (;;) {
+                    await new Promise(resolve => setTimeout(resolve, 1000));
+                    if (isStale()) return null;
+                    if (Date.now() > deadline) {
+                        setExecutionState('completed');
+                        setLogs(prev => [...prev, { time: new Date().toLocaleTimeString(), type: 'error', message: 'Full-dataset results did not arrive in time. Showing preview results.' }]);
+                        break;
+                    }
+                    const poll = await executeAPI.results(data.job_id);
+                    if (isStale()) return null;
+                    if (poll.data.status === 'completed') {
+                        data = poll.data.result;
+                        applyRunResult(data);
+                        break;
+                    }
+                }
+            }
 
             return data;
         } catch (err) {
+            if (isStale()) return null;
             const errMsg = err.response?.data?.error || err.message;
             setExecutionState('failed');
             setLogs(prev => [...prev, { time: new Date().toLocaleTimeString(), type: 'error', message: errMsg }]);
@@ -168,6 +208,7 @@ export function PipelineProvider({ children }) {
     const loadPipeline = useCallback(async (id) => {
         const res = await pipelineAPI.get(id);
         const p = res.data.pipeline;
+        runTokenRef.current++;
         setPipelineId(p._id);
         setPipelineName(p.name);
         setNodes(p.nodes || []);
@@ -178,6 +219,7 @@ export function PipelineProvider({ children }) {
     }, []);
 
     const clearPipeline = useCallback(() => {
+        runTokenRef.current++;
         setNodes([]);
         setEdges([]);
         setSelectedNodeId(null);
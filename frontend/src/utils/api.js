@@ -35,8 +35,9 @@ export const pipelineAPI = {
 // Execute API
 export const executeAPI = {
     baseURL: API_BASE,
-    run: (nodes, edges, uploaded_files) =>
-        api.post('/execute', { nodes, edges, uploaded_files })
+    run: (nodes, edges, uploaded_files, options = {}) =>
+        api.post('/execute', { nodes, edges, uploaded_files, ...options }),
+    results: (jobId) => api.get(`/execute/results/${jobId}`)
 };
 
 // Upload API
@@ -131,6 +131,36 @@ export const NODE_TYPES = {
         inputs: ['train_data'],
         outputs: ['model']
     },
+    hist_gradient_boosting: {
+        id: 'hist_gradient_boosting',
+        label: 'Hist Gradient Boosting',
+        category: 'model',
+        description: 'Binned gradient boosting for large tables, handles missing values natively',
+        config: {
+            max_iter: { type: 'number', label: 'Boosting Iterations', default: 100 },
+            learning_rate: { type: 'number', label: 'Learning Rate', default: 0.1 },
+            max_leaf_nodes: { type: 'number', label: 'Max Leaf Nodes', default: 31 },
+            max_bins: { type: 'number', label: 'Max Bins', default: 255 },
+            categorical_columns: { type: 'string', label: 'Categorical Columns (comma-separated)', default: '' },
+            random_state: { type: 'number', label: 'Random Seed', default: 42 }
+        },
+        inputs: ['train_data'],
+        outputs: ['model']
+    },
+    sgd_linear: {
+        id: 'sgd_linear',
+        label: 'SGD Linear Model',
+        category: 'model',
+        description: 'Linear model trained incrementally over data chunks',
+        config: {
+            alpha: { type: 'number', label: 'Regularization (alpha)', default: 0.0001 },
+            epochs: { type: 'number', label: 'Epochs', default: 5 },
+            chunk_size: { type: 'number', label: 'Chunk Size', default: 10000 },
+            random_state: { type: 'number', label: 'Random Seed', default: 42 }
+        },
+        inputs: ['train_data'],
+        outputs: ['model']
+    },
     accuracy: {
         id: 'accuracy',
         label: 'Model Evaluator',
@@ -154,6 +184,20 @@ export const NODE_TYPES = {
                     { label: 'Classification', value: 'classification' }
                 ],
                 default: 'regression'
+            },
+            comparison_metric: {
+                type: 'select',
+                label: 'Ranking Metric',
+                options: [
+                    { label: 'R² Score', value: 'r2_score' },
+                    { label: 'RMSE', value: 'rmse' },
+                    { label: 'MAE', value: 'mae' },
+                    { label: 'Accuracy', value: 'accuracy' },
+                    { label: 'F1 (Macro)', value: 'f1' },
+                    { label: 'ROC-AUC', value: 'roc_auc' },
+                    { label: 'Log Loss', value: 'log_loss' }
+                ],
+                default: null
             }
         },
         inputs: ['metrics'],
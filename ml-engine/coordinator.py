@@ -0,0 +1,337 @@
+"""
+FlowML – Coordinator
+Schedules pipeline nodes onto a pool of worker engines (see worker.py).
+
+Node outputs that stay on a worker come back as RemoteRefs. When a node is
+scheduled, the worker holding most of its input references is preferred
+(data locality); references held elsewhere are fetched and shipped inline.
+Workers are pinged in the background and dropped after missed heartbeats.
+Coordinator mode requires FLOWML_WORKER_AUTHKEY; workers registering over
+HTTP must sign their address with it.
+If a worker dies, its task is retried on another worker and any upstream
+outputs that lived only on the dead worker are recomputed from lineage.
+"""
+
+import os
+import hmac
+import uuid
+import socket
+import threading
+from multiprocessing.connection import (
+    Connection, AuthenticationError, answer_challenge, deliver_challenge
+)
+
+from worker import RemoteRef, worker_authkey, registration_signature
+
+
+class WorkerUnavailable(Exception):
+    """Raised when a worker cannot be reached or lost a referenced output."""
+
+
+class WorkerHandle:
+    """Coordinator-side view of one registered worker."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = int(port)
+        self.worker_id = None
+        self.alive = False
+        self.missed_heartbeats = 0
+        self.inflight = 0
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def to_dict(self):
+        return {
+            "address": self.address,
+            "worker_id": self.worker_id,
+            "alive": self.alive,
+            "missed_heartbeats": self.missed_heartbeats,
+            "inflight": self.inflight
+        }
+
+
+class WorkerPool:
+    """Registry of worker engines plus the remote node scheduler."""
+
+    def __init__(self, authkey, heartbeat_interval=5.0, max_missed_heartbeats=3,
+                 max_retries=2, task_timeout=30.0, connect_timeout=3.0, allow_registration=True):
+        self.authkey = authkey
+        self.connect_timeout = connect_timeout
+        self.allow_registration = allow_registration
+        self.heartbeat_interval = heartbeat_interval
+        self.max_missed_heartbeats = max_missed_heartbeats
+        self.max_retries = max_retries
+        self.task_timeout = task_timeout
+        self._workers = {}  # address -> WorkerHandle
+        self._lineage = {}  # task_id -> task spec, for recomputing lost outputs
+        self._recomputed = {}  # lost task_id -> replacement output
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build a pool from FLOWML_WORKERS="host:port,host:port", or None if
+        coordinator mode is off. A static FLOWML_WORKERS list disables
+        /workers/register. Raises if FLOWML_WORKER_AUTHKEY is not set.
+        """
+        spec = os.environ.get("FLOWML_WORKERS")
+        if spec is None and os.environ.get("FLOWML_COORDINATOR") != "1":
+            return None
+        pool = cls(
+            authkey=worker_authkey(),
+            heartbeat_interval=float(os.environ.get("FLOWML_HEARTBEAT_INTERVAL", 5)),
+            allow_registration=spec is None
+        )
+        for address in filter(None, (a.strip() for a in (spec or "").split(","))):
+            host, port = address.rsplit(":", 1)
+            pool.register(host, int(port))
+        pool.start()
+        return pool
+
+    # ── Registry & heartbeats ──
+
+    def register(self, host, port):
+        """Add (or refresh) a worker and ping it immediately."""
+        with self._lock:
+            handle = self._workers.get(f"{host}:{int(port)}")
+            if handle is None:
+                handle = WorkerHandle(host, port)
+                self._workers[handle.address] = handle
+        self._heartbeat(handle)
+        return handle.to_dict()
+
+    def verify_registration(self, host, port, signature):
+        """True if a /workers/register call was signed with this pool's authkey."""
+        if not self.allow_registration or not signature:
+            return False
+        return hmac.compare_digest(registration_signature(host, port, self.authkey), signature)
+
+    def workers(self):
+        with self._lock:
+            return [w.to_dict() for w in self._workers.values()]
+
+    def alive_workers(self):
+        with self._lock:
+            return [w for w in self._workers.values() if w.alive]
+
+    def start(self):
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+            self._heartbeat_thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            with self._lock:
+                handles = list(self._workers.values())
+            # Ping in parallel so one slow worker doesn't delay the others' heartbeats
+            pings = [threading.Thread(target=self._heartbeat, args=(h,), daemon=True) for h in handles]
+            for ping in pings:
+                ping.start()
+            for ping in pings:
+                ping.join()
+
+    def _heartbeat(self, handle):
+        try:
+            reply = self._request(handle, {"op": "ping"}, timeout=5.0)
+        except WorkerUnavailable:
+            with self._lock:
+                handle.missed_heartbeats += 1
+                if handle.missed_heartbeats >= self.max_missed_heartbeats:
+                    handle.alive = False
+            return
+        with self._lock:
+            handle.worker_id = reply["worker_id"]
+            handle.alive = True
+            handle.missed_heartbeats = 0
+
+    def _mark_dead(self, handle):
+        with self._lock:
+            handle.alive = False
+            handle.missed_heartbeats = self.max_missed_heartbeats
+
+    def _connect(self, handle):
+        """
+        Equivalent of multiprocessing's Client() with a bound on connecting and
+        on waiting for the worker's auth challenge, so an unreachable or stuck
+        host fails in connect_timeout instead of the OS connect timeout.
+        """
+        try:
+            sock = socket.create_connection((handle.host, handle.port), timeout=self.connect_timeout)
+            sock.setblocking(True)
+            conn = Connection(sock.detach())
+        except OSError as e:
+            raise WorkerUnavailable(f"Worker {handle.address} unreachable: {e}")
+        try:
+            if not conn.poll(self.connect_timeout):
+                raise WorkerUnavailable(f"Worker {handle.address} did not answer the handshake")
+            answer_challenge(conn, self.authkey)
+            deliver_challenge(conn, self.authkey)
+            return conn
+        except (OSError, EOFError, AuthenticationError) as e:
+            conn.close()
+            raise WorkerUnavailable(f"Worker {handle.address} handshake failed: {e}")
+        except WorkerUnavailable:
+            conn.close()
+            raise
+
+    def _request(self, handle, message, timeout=None):
+        conn = self._connect(handle)
+        try:
+            conn.send(message)
+            if not conn.poll(timeout if timeout is not None else self.task_timeout):
+                raise WorkerUnavailable(f"Worker {handle.address} timed out")
+            return conn.recv()
+        except (OSError, EOFError) as e:
+            raise WorkerUnavailable(f"Worker {handle.address} connection lost: {e}")
+        finally:
+            conn.close()
+
+    # ── Scheduling ──
+
+    def _owner(self, worker_id):
+        with self._lock:
+            for handle in self._workers.values():
+                if handle.alive and handle.worker_id == worker_id:
+                    return handle
+        return None
+
+    def _pick_worker(self, inputs, exclude):
+        """Prefer the worker holding most input references, then the least loaded."""
+        candidates = [w for w in self.alive_workers() if w.address not in exclude]
+        if not candidates:
+            raise RuntimeError("No healthy workers available to execute node")
+        local_refs = {}
+        for value in inputs.values():
+            if isinstance(value, RemoteRef):
+                local_refs[value.worker_id] = local_refs.get(value.worker_id, 0) + 1
+        return max(candidates, key=lambda w: (local_refs.get(w.worker_id, 0), -w.inflight))
+
+    def _resolve_ref(self, ref):
+        """Return (ref, owner) for a live copy of a reference, recomputing it if its worker is gone."""
+        with self._lock:
+            replacement = self._recomputed.get(ref.task_id)
+        if replacement is not None:
+            ref = replacement[ref.key]
+        owner = self._owner(ref.worker_id)
+        if owner is None:
+            spec = self._lineage.get(ref.task_id)
+            if spec is None:
+                raise RuntimeError(f"Output {ref.key} was lost and cannot be recomputed")
+            output = self._run_task(spec)
+            with self._lock:
+                self._recomputed[ref.task_id] = output
+            ref = output[ref.key]
+            owner = self._owner(ref.worker_id)
+        return ref, owner
+
+    def _prepare_inputs(self, inputs, target):
+        """Keep references local to `target`; fetch everything else inline."""
+        prepared = {}
+        for key, value in inputs.items():
+            if isinstance(value, RemoteRef):
+                ref, owner = self._resolve_ref(value)
+                if owner is target:
+                    value = ref
+                else:
+                    value = self._fetch(ref, owner)
+            prepared[key] = value
+        return prepared
+
+    def _fetch(self, ref, owner):
+        try:
+            reply = self._request(owner, {"op": "fetch", "ref": ref})
+        except WorkerUnavailable:
+            self._mark_dead(owner)
+            raise
+        if not reply["ok"]:
+            raise WorkerUnavailable(reply["error"])
+        return reply["value"]
+
+    def _run_task(self, spec):
+        tried = set()
+        last_error = None
+        for _ in range(self.max_retries + 1):
+            handle = self._pick_worker(spec["inputs"], exclude=tried)
+            try:
+                inputs = self._prepare_inputs(spec["inputs"], handle)
+            except WorkerUnavailable as e:
+                # An input's owner failed, not the target: _fetch marked the
+                # owner dead, so the next attempt recomputes it from lineage
+                last_error = e
+                continue
+            tried.add(handle.address)
+            task_id = uuid.uuid4().hex
+            with self._lock:
+                handle.inflight += 1
+            try:
+                message = {
+                    "op": "execute",
+                    "task_id": task_id,
+                    "node_type": spec["node_type"],
+                    "inputs": inputs,
+                    "config": spec["config"],
+                    "uploaded_files": spec["uploaded_files"],
+                    "run_id": spec["run_id"]
+                }
+                reply = self._request(handle, message)
+            except WorkerUnavailable as e:
+                self._mark_dead(handle)
+                last_error = e
+                continue
+            finally:
+                with self._lock:
+                    handle.inflight -= 1
+
+            if not reply["ok"]:
+                if reply.get("missing"):
+                    last_error = WorkerUnavailable(reply["error"])
+                    continue
+                # Executor errors are deterministic; don't retry them
+                raise ValueError(reply["error"])
+
+            with self._lock:
+                self._lineage[task_id] = spec
+            return reply["output"]
+
+        raise RuntimeError(f"Node failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def execute(self, node_type, inputs, config, uploaded_files, run_id):
+        """Run one node on the pool. Drop-in for a local executor call."""
+        output = self._run_task({
+            "node_type": node_type,
+            "inputs": inputs,
+            "config": config,
+            "uploaded_files": uploaded_files,
+            "run_id": run_id
+        })
+
+        # Keep a local copy of saved models so /download-model works for remote workers
+        if output.get("model_saved") and isinstance(output.get("model"), RemoteRef):
+            import joblib
+            ref, owner = self._resolve_ref(output["model"])
+            models_dir = os.path.join(os.path.dirname(__file__), "temp_models")
+            os.makedirs(models_dir, exist_ok=True)
+            joblib.dump(self._fetch(ref, owner), os.path.join(models_dir, f"{run_id}_model.pkl"))
+
+        return output
+
+    def release(self, run_id):
+        """Drop a finished run's outputs from every worker and from lineage."""
+        with self._lock:
+            task_ids = {t for t, spec in self._lineage.items() if spec["run_id"] == run_id}
+            for task_id in task_ids:
+                del self._lineage[task_id]
+                self._recomputed.pop(task_id, None)
+        for handle in self.alive_workers():
+            try:
+                self._request(handle, {"op": "release", "run_id": run_id}, timeout=5.0)
+            except WorkerUnavailable:
+                self._mark_dead(handle)
@@ -6,17 +6,101 @@ MVP set: csv_upload, remove_nulls, train_test_split, linear_regression, accuracy
 
 import os
 import io
+import json
+import hashlib
+import tempfile
+import threading
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 from sklearn.datasets import load_iris, fetch_california_housing
 
+# Resumable model state for warm-start training, keyed by model/data fingerprint
+WARM_START_DIR = os.path.join(os.path.dirname(__file__), "temp_models", "warm_start")
+MAX_WARM_START_STATES = 50
 
+_warm_start_locks = {}  # key -> Lock, serialises saves of the same state
+_warm_start_locks_guard = threading.Lock()
 
 
+# ─── Warm Start ───────────────────────────────────────────────────────────────
+
+def _warm_start_key(model_type, problem_type, fixed_params, X_train, y_train):
+    """
+    Fingerprint everything that must be identical for a fitted model to be
+    extended: model family, non-additive hyperparameters and training data.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps(
+        [model_type, problem_type, fixed_params, [str(c) for c in X_train.columns], str(y_train.name)],
+        sort_keys=True, default=str
+    ).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(X_train, index=True).values.tobytes())
+    h.update(pd.util.hash_pandas_object(y_train, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def _load_warm_state(key):
+    """Return {"model", "n_estimators"} saved by a previous run, or None."""
+    import joblib
+    path = os.path.join(WARM_START_DIR, f"{key}.pkl")
+    if not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path)
+    except Exception:
+        return None
+
+
+def _save_warm_state(key, model, n_estimators):
+    """
+    Persist a fitted model so a later run can continue training it.
+    Best effort: a failed save only costs the next run its warm start.
+    """
+    import joblib
+    with _warm_start_locks_guard:
+        lock = _warm_start_locks.setdefault(key, threading.Lock())
+
+    tmp_path = None
+    try:
+        os.makedirs(WARM_START_DIR, exist_ok=True)
+        path = os.path.join(WARM_START_DIR, f"{key}.pkl")
+        with lock:
+            fd, tmp_path = tempfile.mkstemp(dir=WARM_START_DIR, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                joblib.dump({"model": model, "n_estimators": n_estimators}, f)
+            os.replace(tmp_path, path)
+            tmp_path = None
+    except Exception:
+        return
+    finally:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    # Keep only the most recently used states; other threads may be pruning too
+    try:
+        states = []
+        for name in os.listdir(WARM_START_DIR):
+            if not name.endswith(".pkl"):
+                continue
+            stale = os.path.join(WARM_START_DIR, name)
+            try:
+                states.append((os.path.getmtime(stale), stale))
+            except OSError:
+                continue
+        for _, stale in sorted(states)[:-MAX_WARM_START_STATES]:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    except OSError:
+        pass
+
 
 # ─── Input Nodes ──────────────────────────────────────────────────────────────
 
@@ -174,6 +258,25 @@ def execute_train_test_split(inputs, config, uploaded_files=None, run_id=None):
     }
 
 
+def _detect_problem_type(y_train):
+    """Classify a target as "classification" or "regression" from its dtype."""
+    # If target is object/bool or integer with few unique values → classification
+    # If target is float/continuous numeric → regression
+    if y_train.dtype == object or y_train.dtype == bool:
+        return "classification"
+    if pd.api.types.is_integer_dtype(y_train) and y_train.nunique() <= 20:
+        return "classification"
+    if pd.api.types.is_float_dtype(y_train):
+        return "regression"
+    # Fallback: treat as regression for numeric, raise for unknown
+    if pd.api.types.is_numeric_dtype(y_train):
+        return "regression"
+    raise ValueError(
+        f"Cannot determine problem type for target dtype '{y_train.dtype}'. "
+        "Expected numeric (regression) or categorical (classification) target."
+    )
+
+
 # ─── Model Nodes ─────────────────────────────────────────────────────────────
 
 def execute_linear_regression(inputs, config, uploaded_files=None, run_id=None):
@@ -232,13 +335,35 @@ def execute_xgboost(inputs, config, uploaded_files=None, run_id=None):
     learning_rate = float(config.get("learning_rate", 0.1))
     max_depth = int(config.get("max_depth", 6))
 
-    model = XGBRegressor(
-        n_estimators=n_estimators,
-        learning_rate=learning_rate,
-        max_depth=max_depth,
-        random_state=42
+    # ── Continue boosting from a previous run on the same data if only n_estimators grew ──
+    warm_key = _warm_start_key(
+        "xgboost", "regression", {"learning_rate": learning_rate, "max_depth": max_depth},
+        X_train, y_train
     )
-    model.fit(X_train, y_train)
+    state = _load_warm_state(warm_key)
+    reused_estimators = 0
+    if state is not None and state["n_estimators"] <= n_estimators:
+        reused_estimators = state["n_estimators"]
+        model = state["model"]
+        if reused_estimators < n_estimators:
+            model = XGBRegressor(
+                n_estimators=n_estimators - reused_estimators,
+                learning_rate=learning_rate,
+                max_depth=max_depth,
+                random_state=42
+            )
+            model.fit(X_train, y_train, xgb_model=state["model"].get_booster())
+            model.set_params(n_estimators=n_estimators)
+            _save_warm_state(warm_key, model, n_estimators)
+    else:
+        model = XGBRegressor(
+            n_estimators=n_estimators,
+            learning_rate=learning_rate,
+            max_depth=max_depth,
+            random_state=42
+        )
+        model.fit(X_train, y_train)
+        _save_warm_state(warm_key, model, n_estimators)
 
     model_saved = False
     if run_id:
@@ -260,6 +385,8 @@ def execute_xgboost(inputs, config, uploaded_files=None, run_id=None):
         "model_type": "xgboost",
         "feature_importance": feature_importance,
         "feature_columns": list(X_train.columns),
+        "warm_started": reused_estimators > 0,
+        "reused_estimators": reused_estimators,
         "model_saved": model_saved
     }
 
@@ -277,24 +404,7 @@ def execute_random_forest(inputs, config, uploaded_files=None, run_id=None):
     if X_train is None or y_train is None:
         raise ValueError("X_train or y_train missing from training data. Check train_test_split output.")
 
-    # ── Detect problem type: regression vs classification ──
-    # If target is object/bool or integer with few unique values → classification
-    # If target is float/continuous numeric → regression
-    if y_train.dtype == object or y_train.dtype == bool:
-        problem_type = "classification"
-    elif pd.api.types.is_integer_dtype(y_train) and y_train.nunique() <= 20:
-        problem_type = "classification"
-    elif pd.api.types.is_float_dtype(y_train):
-        problem_type = "regression"
-    else:
-        # Fallback: treat as regression for numeric, raise for unknown
-        if pd.api.types.is_numeric_dtype(y_train):
-            problem_type = "regression"
-        else:
-            raise ValueError(
-                f"Cannot determine problem type for target dtype '{y_train.dtype}'. "
-                "Expected numeric (regression) or categorical (classification) target."
-            )
+    problem_type = _detect_problem_type(y_train)
 
     # ── Hyperparameters from config ──
     n_estimators = int(config.get("n_estimators", 100))
@@ -302,21 +412,40 @@ def execute_random_forest(inputs, config, uploaded_files=None, run_id=None):
     max_depth = int(max_depth_raw) if max_depth_raw is not None and max_depth_raw != "" else None
     random_state = int(config.get("random_state", 42))
 
-    # ── Initialize and train ──
-    if problem_type == "classification":
-        model = RandomForestClassifier(
-            n_estimators=n_estimators,
-            max_depth=max_depth,
-            random_state=random_state
-        )
+    # ── Warm start: reuse trees from a previous run on the same data ──
+    # With a fixed random_state, sklearn grows the extra trees exactly as a
+    # fresh fit would, so the result matches training from scratch.
+    warm_key = _warm_start_key(
+        "random_forest", problem_type, {"max_depth": max_depth, "random_state": random_state},
+        X_train, y_train
+    )
+    state = _load_warm_state(warm_key)
+    reused_estimators = 0
+    if state is not None and state["n_estimators"] <= n_estimators:
+        reused_estimators = state["n_estimators"]
+        model = state["model"]
+        if reused_estimators < n_estimators:
+            model.set_params(warm_start=True, n_estimators=n_estimators)
+            model.fit(X_train, y_train)
+            model.set_params(warm_start=False)
+            _save_warm_state(warm_key, model, n_estimators)
     else:
-        model = RandomForestRegressor(
-            n_estimators=n_estimators,
-            max_depth=max_depth,
-            random_state=random_state
-        )
+        # ── Initialize and train ──
+        if problem_type == "classification":
+            model = RandomForestClassifier(
+                n_estimators=n_estimators,
+                max_depth=max_depth,
+                random_state=random_state
+            )
+        else:
+            model = RandomForestRegressor(
+                n_estimators=n_estimators,
+                max_depth=max_depth,
+                random_state=random_state
+            )
 
-    model.fit(X_train, y_train)
+        model.fit(X_train, y_train)
+        _save_warm_state(warm_key, model, n_estimators)
 
     # ── Save model artifact ──
     model_saved = False
@@ -342,14 +471,282 @@ def execute_random_forest(inputs, config, uploaded_files=None, run_id=None):
         "feature_columns": list(X_train.columns),
         "n_estimators": n_estimators,
         "max_depth": max_depth,
+        "warm_started": reused_estimators > 0,
+        "reused_estimators": reused_estimators,
         "model_saved": model_saved
     }
 
 
+def execute_hist_gradient_boosting(inputs, config, uploaded_files=None, run_id=None):
+    """Train a histogram-based gradient boosting model (regression or classification)."""
+    import joblib
+    from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+    from sklearn.inspection import permutation_importance
+    train_data = inputs.get("train_data")
+    if train_data is None:
+        raise ValueError("No training data input received. Ensure a train_test_split node is connected.")
+
+    X_train = train_data.get("X")
+    y_train = train_data.get("y")
+
+    if X_train is None or y_train is None:
+        raise ValueError("X_train or y_train missing from training data. Check train_test_split output.")
+
+    problem_type = _detect_problem_type(y_train)
+
+    # ── Hyperparameters from config ──
+    max_iter = int(config.get("max_iter", 100))
+    learning_rate = float(config.get("learning_rate", 0.1))
+    max_leaf_nodes = int(config.get("max_leaf_nodes", 31))
+    max_bins = int(config.get("max_bins", 255))
+    random_state = int(config.get("random_state", 42))
+
+    # Integer-coded columns to bin as categories instead of ordered values
+    categorical_raw = config.get("categorical_columns", "") or ""
+    categorical_columns = [c.strip() for c in str(categorical_raw).split(",") if c.strip()]
+    unknown = [c for c in categorical_columns if c not in X_train.columns]
+    if unknown:
+        raise ValueError(f"Categorical column(s) not found in features: {', '.join(unknown)}")
+    categorical_mask = [col in categorical_columns for col in X_train.columns] if categorical_columns else None
+
+    # ── Initialize and train (missing values are routed natively, no imputation needed) ──
+    model_cls = HistGradientBoostingClassifier if problem_type == "classification" else HistGradientBoostingRegressor
+    model = model_cls(
+        max_iter=max_iter,
+        learning_rate=learning_rate,
+        max_leaf_nodes=max_leaf_nodes,
+        max_bins=max_bins,
+        categorical_features=categorical_mask,
+        random_state=random_state
+    )
+    model.fit(X_train, y_train)
+
+    # ── Save model artifact ──
+    model_saved = False
+    if run_id:
+        models_dir = os.path.join(os.path.dirname(__file__), "temp_models")
+        os.makedirs(models_dir, exist_ok=True)
+        model_path = os.path.join(models_dir, f"{run_id}_model.pkl")
+        joblib.dump(model, model_path)
+        model_saved = True
+
+    # ── Feature importance ──
+    # Histogram boosting has no impurity importances; use permutation
+    # importance on a bounded sample of the training data instead.
+    sample = X_train.sample(n=min(len(X_train), 2000), random_state=random_state)
+    importances = permutation_importance(
+        model, sample, y_train.loc[sample.index], n_repeats=3, random_state=random_state
+    ).importances_mean
+    feature_importance = {
+        col: round(float(imp), 4)
+        for col, imp in zip(X_train.columns, importances)
+    }
+
+    return {
+        "model": model,
+        "model_type": "hist_gradient_boosting",
+        "problem_type": problem_type,
+        "feature_importance": feature_importance,
+        "feature_columns": list(X_train.columns),
+        "n_iter": int(model.n_iter_),
+        "model_saved": model_saved
+    }
+
+
+def execute_sgd_linear(inputs, config, uploaded_files=None, run_id=None):
+    """Train a linear model with minibatch SGD, streaming the training data in chunks."""
+    import joblib
+    from sklearn.linear_model import SGDClassifier, SGDRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    train_data = inputs.get("train_data")
+    if train_data is None:
+        raise ValueError("No training data input received. Ensure a train_test_split node is connected.")
+
+    X_train = train_data.get("X")
+    y_train = train_data.get("y")
+
+    if X_train is None or y_train is None:
+        raise ValueError("X_train or y_train missing from training data. Check train_test_split output.")
+    if X_train.isnull().values.any():
+        raise ValueError("SGD Linear Model does not accept missing values. Add a Remove Nulls node before the split.")
+
+    problem_type = _detect_problem_type(y_train)
+
+    # ── Hyperparameters from config ──
+    alpha = float(config.get("alpha", 0.0001))
+    epochs = max(1, int(config.get("epochs", 5)))
+    chunk_size = max(1, int(config.get("chunk_size", 10000)))
+    random_state = int(config.get("random_state", 42))
+
+    chunks = [slice(start, start + chunk_size) for start in range(0, len(X_train), chunk_size)]
+
+    # ── Scaling statistics are accumulated chunk by chunk ──
+    scaler = StandardScaler()
+    for rows in chunks:
+        scaler.partial_fit(X_train.iloc[rows])
+
+    # ── Incremental training: one partial_fit per chunk, chunk order shuffled each epoch ──
+    if problem_type == "classification":
+        sgd = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+        classes = np.unique(y_train)
+    else:
+        sgd = SGDRegressor(alpha=alpha, random_state=random_state)
+        classes = None
+
+    rng = np.random.RandomState(random_state)
+    for _ in range(epochs):
+        for i in rng.permutation(len(chunks)):
+            X_chunk = scaler.transform(X_train.iloc[chunks[i]])
+            y_chunk = y_train.iloc[chunks[i]]
+            if classes is not None:
+                sgd.partial_fit(X_chunk, y_chunk, classes=classes)
+            else:
+                sgd.partial_fit(X_chunk, y_chunk)
+
+    model = Pipeline([("scaler", scaler), ("sgd", sgd)])
+
+    # ── Save model artifact ──
+    model_saved = False
+    if run_id:
+        models_dir = os.path.join(os.path.dirname(__file__), "temp_models")
+        os.makedirs(models_dir, exist_ok=True)
+        model_path = os.path.join(models_dir, f"{run_id}_model.pkl")
+        joblib.dump(model, model_path)
+        model_saved = True
+
+    # ── Feature importance: coefficients on standardized features ──
+    coef = np.atleast_2d(sgd.coef_)
+    feature_importance = {
+        col: round(float(value), 4)
+        for col, value in zip(X_train.columns, coef[0] if len(coef) == 1 else np.abs(coef).mean(axis=0))
+    }
+
+    return {
+        "model": model,
+        "model_type": "sgd_linear",
+        "problem_type": problem_type,
+        "feature_importance": feature_importance,
+        "feature_columns": list(X_train.columns),
+        "chunks": len(chunks),
+        "epochs": epochs,
+        "model_saved": model_saved
+    }
+
+
+# ─── Metrics Engine ──────────────────────────────────────────────────────────
+
+REGRESSION_METRICS = ("r2_score", "rmse", "mae")
+CLASSIFICATION_METRICS = ("accuracy", "precision", "recall", "f1", "log_loss", "roc_auc", "confusion_matrix")
+
+# Metrics where a smaller value ranks a model higher
+LOWER_IS_BETTER = {"rmse", "mae", "log_loss"}
+
+
+def _regression_metrics(y_true, y_pred):
+    """R², RMSE and MAE from a single residual vector."""
+    y_true = np.asarray(y_true, dtype=float)
+    residual = y_true - np.asarray(y_pred, dtype=float)
+    centered = y_true - y_true.mean()
+
+    sse = float(residual @ residual)
+    sst = float(centered @ centered)
+    if sst > 0:
+        r2 = 1.0 - sse / sst
+    else:
+        r2 = 1.0 if sse == 0 else 0.0
+
+    return {
+        "r2_score": r2,
+        "rmse": float(np.sqrt(sse / len(y_true))),
+        "mae": float(np.abs(residual).mean())
+    }
+
+
+def _rank_auc(scores, positives):
+    """ROC-AUC via the rank-sum (Mann–Whitney U) identity, ties averaged."""
+    from scipy.stats import rankdata
+    n_pos = int(positives.sum())
+    n_neg = len(positives) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return None
+    ranks = rankdata(scores)
+    return float((ranks[positives].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+def _classification_metrics(y_true, y_pred, proba=None, classes=None):
+    """
+    Accuracy, macro precision/recall/F1 and the confusion matrix from one
+    bincount over encoded (true, predicted) pairs; log-loss and macro
+    one-vs-rest ROC-AUC when class probabilities are available.
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    known = [y_true, y_pred] if classes is None else [y_true, y_pred, np.asarray(classes)]
+    labels = np.unique(np.concatenate(known))
+    k = len(labels)
+
+    t = np.searchsorted(labels, y_true)
+    p = np.searchsorted(labels, y_pred)
+    cm = np.bincount(t * k + p, minlength=k * k).reshape(k, k)
+
+    tp = np.diag(cm).astype(float)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    # Macro-average over labels that occur in y_true or y_pred
+    present = (support + predicted) > 0
+    present_labels = labels[present]
+    result = {
+        "accuracy": float(tp.sum() / len(y_true)),
+        "precision": float(precision[present].mean()),
+        "recall": float(recall[present].mean()),
+        "f1": float(f1[present].mean()),
+        "confusion_matrix": cm[np.ix_(present, present)].tolist(),
+        "labels": [v.item() if hasattr(v, "item") else v for v in present_labels],
+        "log_loss": None,
+        "roc_auc": None
+    }
+
+    if proba is not None and classes is not None:
+        # Spread model columns onto the full label set (unseen labels get p=0)
+        full = np.zeros((len(y_true), k))
+        full[:, np.searchsorted(labels, classes)] = proba
+        p_true = np.clip(full[np.arange(len(y_true)), t], 1e-15, 1.0)
+        result["log_loss"] = float(-np.log(p_true).mean())
+
+        if len(classes) == 2:
+            result["roc_auc"] = _rank_auc(full[:, np.searchsorted(labels, classes[1])], t == np.searchsorted(labels, classes[1]))
+        else:
+            aucs = [_rank_auc(full[:, c], t == c) for c in np.searchsorted(labels, classes)]
+            aucs = [a for a in aucs if a is not None]
+            result["roc_auc"] = float(np.mean(aucs)) if aucs else None
+
+    return result
+
+
+def _requested_metrics(config, available):
+    """Metric names from config["metrics"] (list or comma-separated), defaulting to all."""
+    requested = config.get("metrics")
+    if not requested:
+        return list(available)
+    if isinstance(requested, str):
+        requested = [m.strip() for m in requested.split(",") if m.strip()]
+    return [m for m in requested if m in available]
+
+
+def _round_metric(value):
+    return round(float(value), 4) if value is not None else None
+
+
 # ─── Evaluation Nodes ────────────────────────────────────────────────────────
 
 def execute_accuracy(inputs, config, uploaded_files=None, run_id=None):
-    """Evaluate model using R² score, RMSE, and MAE."""
+    """Evaluate a model: R²/RMSE/MAE for regression, accuracy/F1/ROC-AUC etc. for classification."""
     model = inputs.get("model")
     test_data = inputs.get("test_data")
 
@@ -361,21 +758,51 @@ def execute_accuracy(inputs, config, uploaded_files=None, run_id=None):
     X_test = test_data["X"]
     y_test = test_data["y"]
 
+    problem_type = inputs.get("problem_type") or ("classification" if hasattr(model, "classes_") else "regression")
+    model_type = inputs.get("model_type", "unknown")
+
     # Make predictions
     y_pred = model.predict(X_test)
 
     # Calculate metrics
-    r2 = round(float(r2_score(y_test, y_pred)), 4)
-    rmse = round(float(np.sqrt(mean_squared_error(y_test, y_pred))), 4)
-    mae = round(float(mean_absolute_error(y_test, y_pred)), 4)
+    if problem_type == "classification":
+        proba = model.predict_proba(X_test) if hasattr(model, "predict_proba") else None
+        classes = getattr(model, "classes_", None)
+        computed = _classification_metrics(y_test, y_pred, proba, classes)
+        names = _requested_metrics(config, CLASSIFICATION_METRICS)
+    else:
+        computed = _regression_metrics(y_test, y_pred)
+        names = _requested_metrics(config, REGRESSION_METRICS)
+
+    scores = {
+        name: (computed[name] if name == "confusion_matrix" else _round_metric(computed[name]))
+        for name in names
+    }
 
     # Chart data
     y_test_list = y_test.tolist()
-    y_pred_list = [round(float(v), 4) for v in y_pred.tolist()]
-    chart_data = [
-        {"index": i, "actual": round(float(a), 4), "predicted": round(float(p), 4)}
-        for i, (a, p) in enumerate(zip(y_test_list[:50], y_pred_list[:50]))
-    ]
+    if problem_type == "classification":
+        y_pred_list = [v.item() if hasattr(v, "item") else v for v in y_pred]
+        chart_data = []
+        if "confusion_matrix" in computed:
+            chart_data = [
+                {"actual": str(actual), "predicted": str(pred), "count": int(count)}
+                for actual, row in zip(computed["labels"], computed["confusion_matrix"])
+                for pred, count in zip(computed["labels"], row)
+            ]
+        preview = [{"actual": a, "predicted": p} for a, p in zip(y_test_list[:10], y_pred_list[:10])]
+        charts = {"confusion_matrix": chart_data}
+    else:
+        y_pred_list = [round(float(v), 4) for v in y_pred.tolist()]
+        chart_data = [
+            {"index": i, "actual": round(float(a), 4), "predicted": round(float(p), 4)}
+            for i, (a, p) in enumerate(zip(y_test_list[:50], y_pred_list[:50]))
+        ]
+        preview = [
+            {"actual": round(float(a), 4), "predicted": round(float(p), 4)}
+            for a, p in zip(y_test_list[:10], y_pred_list[:10])
+        ]
+        charts = {"predictions": chart_data}
 
     feature_importance = inputs.get("feature_importance", {})
     feature_chart = [
@@ -383,31 +810,23 @@ def execute_accuracy(inputs, config, uploaded_files=None, run_id=None):
         for k, v in feature_importance.items()
     ]
 
-    model_type = inputs.get("model_type", "unknown")
+    metrics = {**scores, "test_samples": len(y_test), "model_type": model_type, "problem_type": problem_type}
+    if "confusion_matrix" in scores:
+        metrics["labels"] = computed["labels"]
 
     return {
-        "metrics": {
-            "r2_score": r2,
-            "rmse": rmse,
-            "mae": mae,
-            "test_samples": len(y_test),
-            "model_type": model_type
-        },
+        "metrics": metrics,
         "chart_data": {
-            "predictions": chart_data,
+            **charts,
             "feature_importance": feature_chart
         },
-        "preview": [
-            {"actual": round(float(a), 4), "predicted": round(float(p), 4)}
-            for a, p in zip(y_test_list[:10], y_pred_list[:10])
-        ],
+        "preview": preview,
         # Store per-model metrics for comparison node aggregation
         "model_metrics": {
             model_type: {
-                "r2_score": r2,
-                "rmse": rmse,
-                "mae": mae,
-                "test_samples": len(y_test)
+                **{name: value for name, value in scores.items() if name != "confusion_matrix"},
+                "test_samples": len(y_test),
+                "problem_type": problem_type
             }
         }
     }
@@ -417,8 +836,6 @@ def execute_accuracy(inputs, config, uploaded_files=None, run_id=None):
 
 def execute_model_comparison(inputs, config, uploaded_files=None, run_id=None):
     """Compare metrics from multiple evaluation nodes and determine best model."""
-    problem_type = config.get("problem_type", "regression")
-
     # Collect model_metrics from all parent eval nodes
     # The pipeline runner merges inputs from all parents;
     # if multiple parents have "model_metrics", they get merged as dicts
@@ -428,40 +845,54 @@ def execute_model_comparison(inputs, config, uploaded_files=None, run_id=None):
     if not model_metrics and "metrics" in inputs:
         mt = inputs["metrics"].get("model_type", "unknown")
         model_metrics[mt] = {
-            "r2_score": inputs["metrics"].get("r2_score"),
-            "rmse": inputs["metrics"].get("rmse"),
-            "mae": inputs["metrics"].get("mae"),
-            "test_samples": inputs["metrics"].get("test_samples")
+            k: v for k, v in inputs["metrics"].items()
+            if k not in ("model_type", "confusion_matrix", "labels")
         }
 
     if not model_metrics or len(model_metrics) == 0:
         raise ValueError("No model metrics received for comparison. Connect evaluation nodes.")
 
+    # Problem type reported by the evaluators wins over the node config.
+    # Regression and classification scores can't be ranked against each other.
+    reported = {m.get("problem_type") for m in model_metrics.values() if m.get("problem_type")}
+    if len(reported) > 1:
+        models_by_type = ", ".join(
+            f"{name} ({m.get('problem_type', 'unknown')})" for name, m in model_metrics.items()
+        )
+        raise ValueError(
+            f"Cannot compare models trained for different problem types: {models_by_type}. "
+            f"Compare only classifiers or only regressors."
+        )
+    problem_type = reported.pop() if reported else config.get("problem_type", "regression")
+
     # Determine comparison metric based on problem type
-    if problem_type == "classification":
-        comparison_metric = "r2_score"  # higher is better
-        higher_is_better = True
-    else:
-        comparison_metric = "r2_score"  # higher is better for regression too
-        higher_is_better = True
+    default_metric = "f1" if problem_type == "classification" else "r2_score"
+    comparison_metric = config.get("comparison_metric") or default_metric
+    higher_is_better = comparison_metric not in LOWER_IS_BETTER
+
+    missing = [name for name, m in model_metrics.items() if m.get(comparison_metric) is None]
+    if missing:
+        raise ValueError(
+            f"Comparison metric '{comparison_metric}' is not available for: {', '.join(missing)}. "
+            f"Pick a metric every compared model reports."
+        )
+    metric_names = CLASSIFICATION_METRICS if problem_type == "classification" else REGRESSION_METRICS
 
     # Build ranking
     rankings = []
     for model_name, metrics_data in model_metrics.items():
-        score = metrics_data.get(comparison_metric, 0)
-        if score is None:
-            score = 0
-        rankings.append({
+        score = metrics_data.get(comparison_metric)
+        entry = {
             "model": model_name,
-            "score": round(float(score), 4),
-            "r2_score": round(float(metrics_data.get("r2_score", 0)), 4),
-            "rmse": round(float(metrics_data.get("rmse", 0)), 4),
-            "mae": round(float(metrics_data.get("mae", 0)), 4),
+            "score": _round_metric(score),
             "test_samples": metrics_data.get("test_samples", 0)
-        })
+        }
+        for name in metric_names:
+            if name in metrics_data and name != "confusion_matrix":
+                entry[name] = _round_metric(metrics_data[name])
+        rankings.append(entry)
 
-    # Sort by score
-    rankings.sort(key=lambda x: x["score"], reverse=higher_is_better)
+    rankings.sort(key=lambda x: -x["score"] if higher_is_better else x["score"])
 
     best_model = rankings[0]["model"] if rankings else "unknown"
     best_score = rankings[0]["score"] if rankings else 0
@@ -506,6 +937,8 @@ EXECUTORS = {
     "linear_regression": execute_linear_regression,
     "xgboost": execute_xgboost,
     "random_forest": execute_random_forest,
+    "hist_gradient_boosting": execute_hist_gradient_boosting,
+    "sgd_linear": execute_sgd_linear,
     "accuracy": execute_accuracy,
     "model_comparison": execute_model_comparison,
 }
@@ -6,15 +6,22 @@ Receives pipeline definitions, executes them, and returns results.
 
 import os
 import json
+import time
+import uuid
 import shutil
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import asyncio
+from fastapi import FastAPI, UploadFile, File, HTTPException, Header
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
-from pipeline_runner import run_pipeline
+from pipeline_runner import run_pipeline, run_pipeline_batch
 from executors import EXECUTORS
+from coordinator import WorkerPool
+from shared_state import UploadIndex, JobStore
+from single_flight import SingleFlight, pipeline_fingerprint
+from scheduler import RunScheduler, AdmissionRejected, QuotaExceeded
 
 app = FastAPI(
     title="FlowML ML Engine",
@@ -35,8 +42,31 @@ app.add_middleware(
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# Track uploaded files
-uploaded_files_registry: Dict[str, str] = {}
+# Track uploaded files (shared by all uvicorn worker processes)
+upload_index = UploadIndex(UPLOAD_DIR)
+
+# Coordinator mode: set FLOWML_WORKERS="host:port,..." or FLOWML_COORDINATOR=1
+worker_pool: Optional[WorkerPool] = WorkerPool.from_env()
+
+
+# Full-data runs continuing in the background after a preview response
+preview_jobs = JobStore()
+
+# Identical concurrent runs share one execution
+inflight_runs = SingleFlight()
+
+# Bounded, fair-share admission for runs (FLOWML_MAX_CONCURRENT_RUNS / FLOWML_MAX_QUEUED_RUNS)
+run_scheduler = RunScheduler.from_env()
+
+# Keeps background full-data runs referenced until they finish
+background_runs = set()
+
+
+def active_coordinator() -> Optional[WorkerPool]:
+    """Return the worker pool if coordinator mode is on and a worker is healthy."""
+    if worker_pool is not None and worker_pool.alive_workers():
+        return worker_pool
+    return None
 
 
 # ─── Models ──────────────────────────────────────────────────────────────────
@@ -58,6 +88,29 @@ class PipelineRequest(BaseModel):
     nodes: List[NodeData]
     edges: List[EdgeData]
     uploaded_files: Optional[Dict[str, str]] = None
+    user_id: Optional[str] = None
+    tier: str = "free"
+    priority: str = "interactive"
+    preview: bool = False
+    preview_rows: int = 1000
+
+class BatchBinding(BaseModel):
+    name: Optional[str] = None
+    uploaded_files: Optional[Dict[str, str]] = None
+    config: Dict[str, Dict[str, Any]] = {}  # node id -> config overrides
+
+class PipelineBatchRequest(BaseModel):
+    nodes: List[NodeData]
+    edges: List[EdgeData]
+    uploaded_files: Optional[Dict[str, str]] = None
+    user_id: Optional[str] = None
+    tier: str = "free"
+    bindings: List[BatchBinding]
+    max_parallel: int = 4
+
+class WorkerRegistration(BaseModel):
+    host: str
+    port: int
 
 
 # ─── Routes ──────────────────────────────────────────────────────────────────
@@ -67,9 +120,32 @@ def health_check():
     return {"status": "ok", "service": "flowml-ml-engine", "version": "1.0.0"}
 
 
+def resolve_uploaded_files(nodes, user_id, request_files):
+    """Merge the user's indexed uploads with request-supplied paths and mark them used."""
+    files = upload_index.files_for(user_id)
+    if request_files:
+        files.update(request_files)
+    file_ids = [
+        n.get("data", {}).get("config", {}).get("fileId")
+        for n in nodes
+        if n.get("data", {}).get("config", {}).get("fileId")
+    ]
+    upload_index.touch(file_ids, user_id)
+    return files
+
+
+def shed(error: AdmissionRejected):
+    """429 response for a run the scheduler could not admit."""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    """Handle CSV file upload."""
+async def upload_file(file: UploadFile = File(...), x_user_id: Optional[str] = Header(None)):
+    """Handle CSV file upload. Uploads are namespaced by the X-User-Id header."""
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
 
@@ -79,18 +155,13 @@ async def upload_file(file: UploadFile = File(...)):
     if size_mb > 5:
         raise HTTPException(status_code=400, detail=f"File too large ({size_mb:.1f}MB). Max 5MB allowed on Free plan.")
 
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(contents)
-
-    file_id = file.filename
-    uploaded_files_registry[file_id] = file_path
+    entry = upload_index.add(contents, file.filename, user_id=x_user_id)
 
     return {
-        "fileId": file_id,
+        "fileId": entry["fileId"],
         "fileName": file.filename,
         "sizeMB": round(size_mb, 2),
-        "path": file_path
+        "path": entry["path"]
     }
 
 
@@ -101,9 +172,7 @@ async def execute_pipeline(request: PipelineRequest):
     edges = [e.dict() for e in request.edges]
 
     # Merge uploaded files
-    files = {**uploaded_files_registry}
-    if request.uploaded_files:
-        files.update(request.uploaded_files)
+    files = resolve_uploaded_files(nodes, request.user_id, request.uploaded_files)
 
     # Validate node count (free tier: max 10)
     if len(nodes) > 10:
@@ -112,16 +181,169 @@ async def execute_pipeline(request: PipelineRequest):
             detail=f"Free plan allows max 10 nodes. You have {len(nodes)}."
         )
 
-    # Run pipeline
-    result = run_pipeline(
+    preview_rows = max(request.preview_rows, 50) if request.preview else None
+    fingerprint = pipeline_fingerprint(nodes, edges, files, preview_rows=preview_rows)
+
+    async def execute():
+        async with run_scheduler.admit(request.user_id, request.tier, request.priority) as queue:
+            if preview_rows:
+                result = await asyncio.to_thread(run_preview, nodes, edges, files, preview_rows)
+            else:
+                # Run pipeline
+                result = await asyncio.to_thread(
+                    run_pipeline,
+                    nodes=nodes,
+                    edges=edges,
+                    executors=EXECUTORS,
+                    uploaded_files=files,
+                    timeout=30,
+                    coordinator=active_coordinator()
+                )
+
+        if result.get("job_id"):
+            task = asyncio.create_task(
+                run_full_data(result["job_id"], nodes, edges, files, request.user_id, request.tier, request.priority)
+            )
+            background_runs.add(task)
+            task.add_done_callback(background_runs.discard)
+        return {**result, "queue": queue}
+
+    try:
+        return await inflight_runs.run(fingerprint, execute, retry_on=(QuotaExceeded,))
+    except AdmissionRejected as e:
+        raise shed(e)
+
+
+def run_preview(nodes, edges, files, preview_rows):
+    """
+    Run the pipeline on a stratified sample and return provisional results.
+    When the data did not fit in the sample a job id is returned; the
+    full-data run is then queued by run_full_data and served by
+    /pipeline-results/{job_id}.
+    """
+    preview = run_pipeline(
         nodes=nodes,
         edges=edges,
         executors=EXECUTORS,
         uploaded_files=files,
-        timeout=30
+        timeout=30,
+        run_id=f"run_{int(time.time())}_{uuid.uuid4().hex}_preview",
+        coordinator=active_coordinator(),
+        sample_rows=preview_rows
     )
+    if not preview["success"] or not preview.get("sampled"):
+        # A failed preview (e.g. a contract error) would fail on the full data
+        # too, and data that fits in the sample is already the final result
+        return {**preview, "provisional": False, "job_id": None}
+
+    job_id = uuid.uuid4().hex
+    preview_jobs.set(job_id, "running")
+    return {**preview, "provisional": True, "job_id": job_id}
+
+
+async def run_full_data(job_id, nodes, edges, files, user_id, tier, priority):
+    """Full-data run behind a preview, queued with the priority of the run that started it."""
+    try:
+        async with run_scheduler.admit(user_id, tier, priority, bounded_wait=False):
+            result = await asyncio.to_thread(
+                run_pipeline,
+                nodes=nodes,
+                edges=edges,
+                executors=EXECUTORS,
+                uploaded_files=files,
+                timeout=30,
+                coordinator=active_coordinator()
+            )
+    except AdmissionRejected as e:
+        error = f"Full-data run was not admitted: {e}"
+        result = {
+            "success": False,
+            "error": error,
+            "node_states": {},
+            "logs": [{"level": "error", "message": error, "timestamp": time.time()}],
+            "results": {}
+        }
+    preview_jobs.set(job_id, "completed", result)
+
+
+@app.get("/pipeline-results/{job_id}")
+def get_pipeline_results(job_id: str):
+    """Return the full-data result of a preview run once it is done."""
+    job = preview_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return {"job_id": job_id, "status": job["status"], "result": job["result"]}
+
+
+@app.post("/execute-pipeline-batch")
+async def execute_pipeline_batch(request: PipelineBatchRequest):
+    """Execute one pipeline template over many dataset/config bindings."""
+    nodes = [n.dict() for n in request.nodes]
+    edges = [e.dict() for e in request.edges]
+    bindings = [b.dict() for b in request.bindings]
+
+    files = resolve_uploaded_files(nodes, request.user_id, request.uploaded_files)
+    for binding in bindings:
+        upload_index.touch(list((binding.get("uploaded_files") or {}).keys()), request.user_id)
+
+    if len(nodes) > 10:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Free plan allows max 10 nodes. You have {len(nodes)}."
+        )
+    if not bindings:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one binding.")
+    if len(bindings) > 100:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch allows max 100 bindings. You have {len(bindings)}."
+        )
 
-    return result
+    # A batch holds one run slot per instance it runs in parallel
+    max_parallel = min(max(request.max_parallel, 1), 8, run_scheduler.max_concurrent)
+    try:
+        async with run_scheduler.admit(request.user_id, request.tier, "batch", slots=max_parallel) as queue:
+            result = await asyncio.to_thread(
+                run_pipeline_batch,
+                nodes=nodes,
+                edges=edges,
+                executors=EXECUTORS,
+                bindings=bindings,
+                uploaded_files=files,
+                timeout=30,
+                max_parallel=max_parallel,
+                coordinator=active_coordinator()
+            )
+    except AdmissionRejected as e:
+        raise shed(e)
+
+    return {**result, "queue": queue}
+
+
+@app.get("/queue")
+def queue_status(user_id: Optional[str] = None):
+    """Running/queued run counts, plus the caller's queue positions when user_id is given."""
+    return run_scheduler.status(user_id or None)
+
+
+@app.post("/workers/register")
+def register_worker(registration: WorkerRegistration, x_worker_signature: Optional[str] = Header(None)):
+    """Register a worker engine with this coordinator. Requests must be signed with the worker authkey."""
+    if worker_pool is None:
+        raise HTTPException(status_code=400, detail="Coordinator mode is not enabled on this engine.")
+    if not worker_pool.allow_registration:
+        raise HTTPException(status_code=403, detail="Workers are configured by FLOWML_WORKERS; registration is disabled.")
+    if not worker_pool.verify_registration(registration.host, registration.port, x_worker_signature):
+        raise HTTPException(status_code=403, detail="Invalid worker signature.")
+    return worker_pool.register(registration.host, registration.port)
+
+
+@app.get("/workers")
+def list_workers():
+    """List registered worker engines and their heartbeat state."""
+    if worker_pool is None:
+        return {"coordinator": False, "workers": []}
+    return {"coordinator": True, "workers": worker_pool.workers()}
 
 
 @app.get("/download-model/{model_file_id}")
@@ -152,4 +374,6 @@ def get_schema():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=5001)
+    # Uploads and preview jobs live in shared_state, so several workers can serve requests
+    workers = int(os.environ.get("FLOWML_ENGINE_WORKERS", 1))
+    uvicorn.run("main:app" if workers > 1 else app, host="0.0.0.0", port=5001, workers=workers)
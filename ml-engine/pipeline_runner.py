@@ -1,110 +1,168 @@
 """
 FlowML – Pipeline Runner
-Handles DAG validation, topological sorting, and sequential node execution.
+Executes compiled pipeline plans node by node (see pipeline_compiler.py for
+DAG validation, topological sorting and input contract checks).
 """
 
+import copy
+import hashlib
+import json
+import threading
 import time
-from collections import deque
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 
-def validate_dag(nodes, edges):
-    """Validate that the graph has no cycles (is a valid DAG)."""
-    adj = {}
-    in_degree = {}
+from pipeline_compiler import compile_pipeline, node_type_of
 
-    for node in nodes:
-        node_id = node["id"]
-        adj[node_id] = []
-        in_degree[node_id] = 0
-
-    for edge in edges:
-        source = edge["source"]
-        target = edge["target"]
-        if source not in adj:
-            adj[source] = []
-        adj[source].append(target)
-        in_degree[target] = in_degree.get(target, 0) + 1
-
-    queue = deque([n for n in in_degree if in_degree[n] == 0])
-    visited = 0
-
-    while queue:
-        current = queue.popleft()
-        visited += 1
-        for neighbor in adj.get(current, []):
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
-
-    if visited != len(nodes):
-        return False, "Cycle detected in pipeline graph"
-    return True, None
-
-
-def topological_sort(nodes, edges):
-    """Return nodes in topological execution order."""
-    adj = {}
-    in_degree = {}
+# Node types whose outputs depend only on their config and upstream data.
+# Batch runs compute these once and share them between instances; model and
+# evaluation nodes always run per instance because they write run artifacts.
+SHAREABLE_NODE_TYPES = {
+    "csv_upload",
+    "sample_dataset",
+    "remove_nulls",
+    "min_max_scaler",
+    "train_test_split",
+}
 
-    for node in nodes:
-        node_id = node["id"]
-        adj[node_id] = []
-        in_degree[node_id] = 0
 
-    for edge in edges:
-        source = edge["source"]
-        target = edge["target"]
-        adj[source].append(target)
-        in_degree[target] = in_degree.get(target, 0) + 1
+# Node types that load raw data; preview runs sample their dataframe output.
+LOADER_NODE_TYPES = {"csv_upload", "sample_dataset"}
+
+# Node types that read this engine's upload directory. In coordinator mode
+# they still run locally and their dataframe is shipped to the workers, so
+# workers don't need access to the coordinator's disk.
+LOCAL_NODE_TYPES = {"csv_upload"}
+
+# Targets with at most this many distinct values are sampled per class
+STRATIFY_MAX_CLASSES = 20
+
+
+def sample_dataframe(df, max_rows, stratify_column=None, random_state=42):
+    """
+    Return at most ~max_rows rows of df. When stratify_column looks
+    categorical, every class keeps its share of rows (and at least one).
+    """
+    if len(df) <= max_rows:
+        return df
+
+    frac = max_rows / len(df)
+    if stratify_column in df.columns and df[stratify_column].nunique() <= STRATIFY_MAX_CLASSES:
+        rng = np.random.RandomState(random_state)
+        positions = []
+        for class_positions in df.groupby(stratify_column, dropna=False).indices.values():
+            n = max(1, int(round(len(class_positions) * frac)))
+            positions.extend(rng.choice(class_positions, n, replace=False))
+        return df.iloc[np.sort(positions)]
 
-    queue = deque([n for n in in_degree if in_degree[n] == 0])
-    order = []
+    return df.sample(n=max_rows, random_state=random_state).sort_index()
 
-    while queue:
-        current = queue.popleft()
-        order.append(current)
-        for neighbor in adj[current]:
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
 
-    return order
+def _stratify_column(nodes, df):
+    """
+    Target column the pipeline's split node will use on df, or None without
+    a split node. Mirrors execute_train_test_split's fallback to the last
+    column when target_column is empty or unknown.
+    """
+    for node in nodes:
+        if node_type_of(node) == "train_test_split":
+            target = node.get("data", {}).get("config", {}).get("target_column")
+            return target if target in df.columns else df.columns[-1]
+    return None
 
 
-def run_pipeline(nodes, edges, executors, uploaded_files=None, timeout=30):
+class SharedOutputCache:
+    """
+    Thread-safe store of node outputs shared between the instances of a batch.
+    Each key is computed at most once; concurrent requests for the same key
+    wait for the first one to finish.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._outputs = {}
+        self.hits = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if key in self._outputs:
+                with self._lock:
+                    self.hits += 1
+                return self._outputs[key], True
+            output = compute()
+            self._outputs[key] = output
+            return output, False
+
+
+def _node_signature(node_type, config, parent_signatures, uploaded_files):
+    """Hash a node's type, config, resolved input file and upstream signatures."""
+    file_path = None
+    if node_type == "csv_upload" and uploaded_files:
+        file_path = uploaded_files.get(config.get("fileId", ""))
+    payload = json.dumps(
+        [node_type, config, file_path, sorted(parent_signatures)],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def run_pipeline(nodes, edges, executors, uploaded_files=None, timeout=30,
+                 run_id=None, plan=None, output_cache=None, coordinator=None,
+                 sample_rows=None):
     """
     Execute the pipeline:
-    1. Validate DAG
-    2. Topological sort
-    3. Execute each node in order
-    4. Track states and collect results
+    1. Compile the graph (DAG validation, topological sort, input contracts)
+    2. Execute each node in order
+    3. Track states and collect results
+
+    `plan` may be passed by callers that have already compiled the graph
+    (batch runs). When `output_cache` is given, outputs
+    of SHAREABLE_NODE_TYPES are looked up in / stored to it. When a
+    `coordinator` (WorkerPool) is given, nodes run on its worker engines.
+    When `sample_rows` is set, loader outputs are cut down to a stratified
+    sample of that many rows (preview runs); the result reports `sampled`.
     """
-    is_valid, error = validate_dag(nodes, edges)
-    if not is_valid:
+    if run_id is None:
+        run_id = f"run_{int(time.time())}_{uuid.uuid4().hex}"
+    try:
+        return _execute_pipeline(
+            nodes, edges, executors, uploaded_files, timeout,
+            run_id, plan, output_cache, coordinator, sample_rows
+        )
+    finally:
+        # Batch callers release worker outputs once every instance is done
+        if coordinator is not None and output_cache is None:
+            coordinator.release(run_id)
+
+
+def _execute_pipeline(nodes, edges, executors, uploaded_files, timeout,
+                      run_id, plan, output_cache, coordinator, sample_rows):
+    if plan is None:
+        plan = compile_pipeline(nodes, edges, executors)
+    if not plan.is_valid:
         return {
             "success": False,
-            "error": error,
+            "error": plan.error,
             "node_states": {},
-            "logs": [{"level": "error", "message": error, "timestamp": time.time()}],
+            "logs": [{"level": "error", "message": plan.error, "timestamp": time.time()}],
             "results": {}
         }
 
-    execution_order = topological_sort(nodes, edges)
-
+    execution_order = plan.order
     node_map = {n["id"]: n for n in nodes}
+    parent_map = plan.parent_map
 
-    # Build adjacency for finding parent outputs
-    parent_map = {}
-    for edge in edges:
-        target = edge["target"]
-        source = edge["source"]
-        if target not in parent_map:
-            parent_map[target] = []
-        parent_map[target].append(source)
-
-    run_id = f"run_{int(time.time())}"
     node_states = {n["id"]: "idle" for n in nodes}
     node_outputs = {}
+    node_signatures = {}
+    sampled = False
     logs = []
     results = {}
     start_time = time.time()
@@ -159,8 +217,43 @@ def run_pipeline(nodes, edges, executors, uploaded_files=None, timeout=30):
             if executor_fn is None:
                 raise ValueError(f"No executor found for node type: {node_type}")
 
-            # Pass run_id to executors so they can save persistent artifacts
-            output = executor_fn(inputs, config, uploaded_files, run_id=run_id)
+            def call_executor():
+                # Pass run_id to executors so they can save persistent artifacts.
+                # Preview loaders run locally so their dataframe can be sampled
+                # here before it is shipped to the workers.
+                run_locally = node_type in LOCAL_NODE_TYPES or (sample_rows and node_type in LOADER_NODE_TYPES)
+                if coordinator is not None and not run_locally:
+                    return coordinator.execute(node_type, inputs, config, uploaded_files, run_id)
+                return executor_fn(inputs, config, uploaded_files, run_id=run_id)
+
+            shared = False
+            if output_cache is not None and node_type in SHAREABLE_NODE_TYPES:
+                signature = _node_signature(
+                    node_type, config,
+                    [node_signatures[pid] for pid in parent_ids if pid in node_signatures],
+                    uploaded_files
+                )
+                node_signatures[node_id] = signature
+                output, shared = output_cache.get_or_compute(
+                    signature,
+                    call_executor
+                )
+            else:
+                output = call_executor()
+
+            if sample_rows and node_type in LOADER_NODE_TYPES and "dataframe" in output:
+                full_rows = len(output["dataframe"])
+                df = sample_dataframe(
+                    output["dataframe"], sample_rows, _stratify_column(nodes, output["dataframe"])
+                )
+                if len(df) < full_rows:
+                    sampled = True
+                    output = {**output, "dataframe": df, "shape": list(df.shape)}
+                    logs.append({
+                        "level": "info",
+                        "message": f"Preview: sampled {len(df)} of {full_rows} rows",
+                        "timestamp": time.time()
+                    })
             node_outputs[node_id] = output
             node_states[node_id] = "success"
 
@@ -178,7 +271,8 @@ def run_pipeline(nodes, edges, executors, uploaded_files=None, timeout=30):
 
             logs.append({
                 "level": "success",
-                "message": f"Node '{node.get('data', {}).get('label', node_id)}' completed successfully",
+                "message": f"Node '{node.get('data', {}).get('label', node_id)}' completed successfully"
+                           + (" (shared with another batch instance)" if shared else ""),
                 "timestamp": time.time()
             })
 
@@ -211,6 +305,89 @@ def run_pipeline(nodes, edges, executors, uploaded_files=None, timeout=30):
         "logs": logs,
         "results": results,
         "execution_time": total_time,
+        "sampled": sampled,
         "model_download_available": model_file_id is not None,
         "model_file_id": model_file_id
     }
+
+
+def _bind_nodes(nodes, binding):
+    """Return a copy of the template nodes with a binding's config overrides applied."""
+    overrides = binding.get("config") or {}
+    bound = copy.deepcopy(nodes)
+    for node in bound:
+        node_overrides = overrides.get(node["id"])
+        if node_overrides:
+            data = node.setdefault("data", {})
+            data["config"] = {**data.get("config", {}), **node_overrides}
+    return bound
+
+
+def run_pipeline_batch(nodes, edges, executors, bindings, uploaded_files=None,
+                       timeout=30, max_parallel=4, coordinator=None):
+    """
+    Execute one pipeline template against many dataset/config bindings.
+
+    The graph is compiled once, data-preparation outputs that are
+    identical across bindings are computed once, and the instances run in
+    parallel. Returns a consolidated result table with one row per binding.
+    """
+    plan = compile_pipeline(nodes, edges, executors)
+    if not plan.is_valid:
+        return {
+            "success": False,
+            "error": plan.error,
+            "instances": len(bindings),
+            "table": [],
+            "runs": []
+        }
+
+    output_cache = SharedOutputCache()
+    batch_id = f"batch_{int(time.time())}_{uuid.uuid4().hex}"
+    start_time = time.time()
+
+    def run_instance(index):
+        binding = bindings[index]
+        files = {**(uploaded_files or {}), **(binding.get("uploaded_files") or {})}
+        return run_pipeline(
+            nodes=_bind_nodes(nodes, binding),
+            edges=edges,
+            executors=executors,
+            uploaded_files=files,
+            timeout=timeout,
+            run_id=f"{batch_id}_{index}",
+            plan=plan,
+            output_cache=output_cache,
+            coordinator=coordinator
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        runs = list(pool.map(run_instance, range(len(bindings))))
+
+    if coordinator is not None:
+        for index in range(len(bindings)):
+            coordinator.release(f"{batch_id}_{index}")
+
+    table = []
+    for index, (binding, run) in enumerate(zip(bindings, runs)):
+        table.append({
+            "binding": binding.get("name") or str(index),
+            "success": run["success"],
+            "error": run["error"],
+            "execution_time": run.get("execution_time"),
+            "metrics": {
+                node_id: value for node_id, value in run["results"].items()
+                if not node_id.endswith(("_chart", "_comparison"))
+            },
+            "model_file_id": run.get("model_file_id")
+        })
+
+    return {
+        "success": all(run["success"] for run in runs),
+        "error": None,
+        "instances": len(bindings),
+        "shared_node_hits": output_cache.hits,
+        "execution_time": round(time.time() - start_time, 2),
+        "table": table,
+        "runs": runs
+    }
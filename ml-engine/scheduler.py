@@ -0,0 +1,199 @@
+"""
+FlowML – Run Scheduler
+Admission control in front of run_pipeline:
+
+- at most `max_concurrent` slots are in use at once; the rest wait in a
+  queue. A run takes one slot, a batch one slot per parallel instance
+- interactive (canvas) runs are dispatched before batch runs; a run that
+  has waited `aging_seconds` is promoted one priority class, so batch work
+  is never starved
+- within a priority class, the user with the fewest running runs goes first
+  (fair share), then first come first served
+- per-tier quotas cap how many runs a user may have running and queued
+- when the queue is full the request is shed immediately with a retry hint
+- a run that waits longer than `max_wait` seconds for a slot is shed too, so
+  callers (the backend proxy) can bound their own timeouts
+"""
+
+import os
+import time
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+
+PRIORITY_CLASSES = {"interactive": 0, "batch": 1}
+
+TIER_LIMITS = {
+    "free": {"max_running": 1, "max_queued": 3},
+    "pro": {"max_running": 3, "max_queued": 10},
+}
+
+DEFAULT_TIER = "free"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a run is shed because a queue or quota is full."""
+
+    def __init__(self, message, retry_after=5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QuotaExceeded(AdmissionRejected):
+    """Raised when a run is shed because its user's plan quota is used up."""
+
+
+class _Ticket:
+    def __init__(self, seq, user_id, tier, priority, slots):
+        self.seq = seq
+        self.user_id = user_id
+        self.tier = tier
+        self.priority = priority
+        self.slots = slots
+        self.enqueued = time.time()
+        self.granted = asyncio.get_running_loop().create_future()
+
+
+class RunScheduler:
+    """Bounded-concurrency, priority and fair-share queue for pipeline runs."""
+
+    def __init__(self, max_concurrent=4, max_queue=32, max_wait=60.0, aging_seconds=30.0,
+                 tier_limits=None):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.aging_seconds = aging_seconds
+        self.tier_limits = tier_limits or TIER_LIMITS
+        self._queue = []
+        self._running = {}  # user_id -> running count
+        self._slots_in_use = 0
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_concurrent=int(os.environ.get("FLOWML_MAX_CONCURRENT_RUNS", 4)),
+            max_queue=int(os.environ.get("FLOWML_MAX_QUEUED_RUNS", 32)),
+            max_wait=float(os.environ.get("FLOWML_MAX_QUEUE_WAIT", 60)),
+            aging_seconds=float(os.environ.get("FLOWML_PRIORITY_AGING_SECONDS", 30))
+        )
+
+    @property
+    def running(self):
+        return sum(self._running.values())
+
+    def _limits(self, tier):
+        return self.tier_limits.get(tier, self.tier_limits[DEFAULT_TIER])
+
+    def _effective_priority(self, ticket, now):
+        aged = int((now - ticket.enqueued) // self.aging_seconds) if self.aging_seconds else 0
+        return max(PRIORITY_CLASSES.get(ticket.priority, 0) - aged, 0)
+
+    def _order(self):
+        """Queued tickets in dispatch order."""
+        now = time.time()
+        return sorted(
+            self._queue,
+            key=lambda t: (self._effective_priority(t, now), self._running.get(t.user_id, 0), t.seq)
+        )
+
+    def _dispatch(self):
+        # Drop tickets whose waiter was cancelled before being granted
+        self._queue = [t for t in self._queue if not t.granted.done()]
+        while self._slots_in_use < self.max_concurrent:
+            ticket = next(
+                (t for t in self._order()
+                 if self._running.get(t.user_id, 0) < self._limits(t.tier)["max_running"]),
+                None
+            )
+            # The head of the queue waits for enough free slots rather than
+            # being overtaken by smaller runs, so wide batches aren't starved
+            if ticket is None or self._slots_in_use + ticket.slots > self.max_concurrent:
+                return
+            self._queue.remove(ticket)
+            self._running[ticket.user_id] = self._running.get(ticket.user_id, 0) + 1
+            self._slots_in_use += ticket.slots
+            ticket.granted.set_result(True)
+
+    def _release(self, ticket):
+        self._slots_in_use -= ticket.slots
+        self._running[ticket.user_id] -= 1
+        if self._running[ticket.user_id] == 0:
+            del self._running[ticket.user_id]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, user_id, tier=DEFAULT_TIER, priority="interactive", bounded_wait=True, slots=1):
+        """
+        Wait for `slots` run slots (capped at max_concurrent). Yields
+        {"queue_position", "wait_seconds", "slots"} for the response; raises
+        AdmissionRejected when the run has to be shed. Runs nobody is waiting
+        on (bounded_wait=False) may queue indefinitely.
+        """
+        user_id = user_id or "anonymous"
+        tier = tier if tier in self.tier_limits else DEFAULT_TIER
+        priority = priority if priority in PRIORITY_CLASSES else "interactive"
+
+        if len(self._queue) >= self.max_queue:
+            raise AdmissionRejected(
+                f"Engine is at capacity ({self.running} running, {len(self._queue)} queued). Try again shortly.",
+                retry_after=10
+            )
+        user_queued = sum(1 for t in self._queue if t.user_id == user_id)
+        if user_queued >= self._limits(tier)["max_queued"]:
+            raise QuotaExceeded(
+                f"You already have {user_queued} runs queued, the {tier} plan allows "
+                f"{self._limits(tier)['max_queued']}. Wait for them to finish."
+            )
+
+        ticket = _Ticket(next(self._seq), user_id, tier, priority, min(max(slots, 1), self.max_concurrent))
+        self._queue.append(ticket)
+        self._dispatch()
+        position = self._order().index(ticket) + 1 if ticket in self._queue else 0
+
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket.granted), self.max_wait if bounded_wait else None)
+        except asyncio.TimeoutError:
+            if not ticket.granted.done():
+                self._queue.remove(ticket)
+                ticket.granted.cancel()
+                raise AdmissionRejected(
+                    f"No run slot became free within {self.max_wait:g}s "
+                    f"({self.running} running, {len(self._queue)} queued). Try again shortly.",
+                    retry_after=10
+                )
+            # Granted in the same tick as the timeout: keep the slot
+        except asyncio.CancelledError:
+            # Client went away while queued (or right after being granted)
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+            elif ticket.granted.done() and not ticket.granted.cancelled():
+                self._release(ticket)
+            raise
+
+        try:
+            yield {
+                "queue_position": position,
+                "wait_seconds": round(time.time() - ticket.enqueued, 2),
+                "slots": ticket.slots
+            }
+        finally:
+            self._release(ticket)
+
+    def status(self, user_id=None):
+        """Queue snapshot; with user_id, that user's queued runs and positions."""
+        order = self._order()
+        snapshot = {
+            "running": self.running,
+            "slots_in_use": self._slots_in_use,
+            "max_concurrent": self.max_concurrent,
+            "queued": len(order),
+            "max_queue": self.max_queue
+        }
+        if user_id is not None:
+            snapshot["positions"] = [
+                {"position": i + 1, "priority": t.priority, "waiting_seconds": round(time.time() - t.enqueued, 2)}
+                for i, t in enumerate(order) if t.user_id == user_id
+            ]
+            snapshot["user_running"] = self._running.get(user_id, 0)
+        return snapshot
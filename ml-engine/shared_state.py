@@ -0,0 +1,179 @@
+"""
+FlowML – Shared State
+Engine state that must be visible to every worker process when uvicorn runs
+with several workers, backed by a single SQLite database (WAL mode):
+
+- UploadIndex: uploaded CSVs keyed by content hash, namespaced per user,
+  stored once on disk however often they are uploaded, and expired by TTL.
+- JobStore: results of background full-data runs started by preview mode.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+
+STATE_DB_PATH = os.environ.get(
+    "FLOWML_STATE_DB", os.path.join(os.path.dirname(__file__), "uploads", "engine_state.db")
+)
+
+# Uploads not used for this long are dropped from the index (and disk)
+UPLOAD_TTL_SECONDS = float(os.environ.get("FLOWML_UPLOAD_TTL_HOURS", 24)) * 3600
+
+# Finished preview jobs are kept this long for polling
+JOB_TTL_SECONDS = 3600
+
+DEFAULT_NAMESPACE = "anonymous"
+
+
+@contextmanager
+def _connect(db_path):
+    """Autocommit connection, closed on exit."""
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        yield conn
+    finally:
+        conn.close()
+
+
+class UploadIndex:
+    """Content-addressed, per-user index of uploaded CSV files."""
+
+    def __init__(self, upload_dir, db_path=STATE_DB_PATH, ttl_seconds=UPLOAD_TTL_SECONDS):
+        self.upload_dir = upload_dir
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(upload_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with _connect(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS uploads (
+                    user_id TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (user_id, content_hash)
+                )
+            """)
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.upload_dir, f"{content_hash}.csv")
+
+    def add(self, contents, file_name, user_id=None):
+        """
+        Store an upload and return its index entry. Identical content is
+        written to disk once and shared by every user who uploads it.
+        """
+        user_id = user_id or DEFAULT_NAMESPACE
+        content_hash = hashlib.sha256(contents).hexdigest()
+        path = self._blob_path(content_hash)
+
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(contents)
+            os.replace(tmp_path, path)
+        else:
+            # Refresh mtime so a concurrent cleanup doesn't delete it
+            os.utime(path)
+
+        now = time.time()
+        with _connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT INTO uploads (user_id, content_hash, file_name, size_bytes, created, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, content_hash)
+                DO UPDATE SET file_name = excluded.file_name, last_used = excluded.last_used
+            """, (user_id, content_hash, file_name, len(contents), now, now))
+
+        self.cleanup()
+        return {"fileId": content_hash, "fileName": file_name, "path": path}
+
+    def files_for(self, user_id=None):
+        """
+        Return {fileId: path} for a user's uploads. The original file name is
+        also accepted as a fileId (newest upload wins) for older clients.
+        """
+        user_id = user_id or DEFAULT_NAMESPACE
+        with _connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT content_hash, file_name FROM uploads WHERE user_id = ? ORDER BY last_used",
+                (user_id,)
+            ).fetchall()
+
+        files = {}
+        for content_hash, file_name in rows:
+            path = self._blob_path(content_hash)
+            files[file_name] = path
+            files[content_hash] = path
+        return files
+
+    def touch(self, file_ids, user_id=None):
+        """Mark uploads as used so TTL cleanup keeps them."""
+        if not file_ids:
+            return
+        user_id = user_id or DEFAULT_NAMESPACE
+        now = time.time()
+        with _connect(self.db_path) as conn:
+            for file_id in file_ids:
+                conn.execute(
+                    "UPDATE uploads SET last_used = ? WHERE user_id = ? AND (content_hash = ? OR file_name = ?)",
+                    (now, user_id, file_id, file_id)
+                )
+
+    def cleanup(self):
+        """Drop expired index entries and delete blobs nobody references any more."""
+        cutoff = time.time() - self.ttl_seconds
+        with _connect(self.db_path) as conn:
+            conn.execute("DELETE FROM uploads WHERE last_used < ?", (cutoff,))
+            live = {row[0] for row in conn.execute("SELECT DISTINCT content_hash FROM uploads")}
+
+        for name in os.listdir(self.upload_dir):
+            if not name.endswith(".csv"):
+                continue
+            path = os.path.join(self.upload_dir, name)
+            if name[:-4] not in live and os.path.getmtime(path) < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class JobStore:
+    """Status and result of background pipeline runs, shared across processes."""
+
+    def __init__(self, db_path=STATE_DB_PATH, ttl_seconds=JOB_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with _connect(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    updated REAL NOT NULL
+                )
+            """)
+
+    def set(self, job_id, status, result=None):
+        now = time.time()
+        with _connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, result, updated) VALUES (?, ?, ?, ?)",
+                (job_id, status, json.dumps(result, default=str) if result is not None else None, now)
+            )
+            conn.execute("DELETE FROM jobs WHERE updated < ?", (now - self.ttl_seconds,))
+
+    def get(self, job_id):
+        """Return {"status", "result"} or None for unknown/expired jobs."""
+        with _connect(self.db_path) as conn:
+            row = conn.execute("SELECT status, result FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {"status": row[0], "result": json.loads(row[1]) if row[1] else None}
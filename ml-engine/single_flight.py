@@ -0,0 +1,110 @@
+"""
+FlowML – Single-Flight Execution
+Coalesces identical concurrent pipeline runs: while a run for a given
+fingerprint is in flight, later identical requests wait for it and receive
+the same result instead of executing the pipeline again.
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import threading
+
+from pipeline_compiler import node_type_of
+
+_file_hash_cache = {}  # (path, size, mtime) -> sha256
+_file_hash_lock = threading.Lock()
+
+
+def file_content_hash(path):
+    """sha256 of a file's bytes, cached by path, size and mtime."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_size, stat.st_mtime)
+    with _file_hash_lock:
+        cached = _file_hash_cache.get(key)
+    if cached is not None:
+        return cached
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    with _file_hash_lock:
+        _file_hash_cache[key] = digest
+    return digest
+
+
+def pipeline_fingerprint(nodes, edges, uploaded_files=None, **options):
+    """
+    Hash what determines a run's result: node ids, types and config, the
+    edges, the content of every referenced dataset, and run options.
+    Layout, labels and UI status are ignored.
+    """
+    normalized_nodes = []
+    for node in sorted(nodes, key=lambda n: n["id"]):
+        node_type = node_type_of(node)
+        config = node.get("data", {}).get("config", {}) or {}
+        dataset = None
+        if node_type == "csv_upload" and uploaded_files:
+            path = uploaded_files.get(config.get("fileId", ""))
+            dataset = file_content_hash(path) if path else None
+        normalized_nodes.append([node["id"], node_type, config, dataset])
+
+    normalized_edges = sorted(
+        [e["source"], e["target"], e.get("sourceHandle"), e.get("targetHandle")] for e in edges
+    )
+    payload = json.dumps([normalized_nodes, normalized_edges, options], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Per-process registry of in-flight runs keyed by fingerprint."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.coalesced = 0
+
+    async def run(self, key, fn, retry_on=()):
+        """
+        Await the coroutine function `fn`, or wait for the identical run
+        already in flight. Waiters get a copy of the result marked `coalesced`
+        and never queue for a run slot of their own. Errors of a `retry_on`
+        type are specific to the leading request (e.g. its user's quota), so
+        waiters run `fn` themselves instead of sharing them.
+        """
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this waiter itself was cancelled
+                continue  # the leader was cancelled; run (or join) a fresh attempt
+            except retry_on:
+                continue
+            self.coalesced += 1
+            return {**result, "coalesced": True}
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody was waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
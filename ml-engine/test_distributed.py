@@ -0,0 +1,150 @@
+"""
+Distributed execution against real worker processes: two worker.py engines
+sharing an authkey, driven through a WorkerPool.
+
+Run from ml-engine/: python -m pytest test_distributed.py
+"""
+
+import os
+import sys
+import time
+import socket
+import secrets
+import subprocess
+
+import pytest
+
+from coordinator import WorkerPool
+from executors import EXECUTORS, execute_sample_dataset
+from pipeline_runner import run_pipeline
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUN_ID = "run_distributed_test"
+
+NODES = [
+    {"id": "data", "data": {"nodeType": "sample_dataset", "config": {"dataset_name": "iris"}}},
+    {"id": "split", "data": {"nodeType": "train_test_split", "config": {"target_column": "target"}}},
+    {"id": "model", "data": {"nodeType": "random_forest", "config": {"n_estimators": 10}}},
+    {"id": "eval", "data": {"nodeType": "accuracy", "config": {}}},
+]
+EDGES = [
+    {"id": "e1", "source": "data", "target": "split"},
+    {"id": "e2", "source": "split", "target": "model"},
+    {"id": "e3", "source": "model", "target": "eval"},
+    {"id": "e4", "source": "split", "target": "eval"},
+]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def cluster():
+    """Two live workers registered with a pool; yields (pool, {port: process})."""
+    authkey = secrets.token_hex(16)
+    env = dict(os.environ, FLOWML_WORKER_AUTHKEY=authkey)
+    procs = {}
+    for port in (_free_port(), _free_port()):
+        procs[port] = subprocess.Popen(
+            [sys.executable, "worker.py", "--port", str(port)],
+            cwd=ENGINE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    # No heartbeat thread: workers are only marked dead by failed calls,
+    # which keeps the failure paths under test deterministic
+    pool = WorkerPool(authkey.encode(), task_timeout=60.0)
+    try:
+        deadline = time.time() + 30
+        while len(pool.alive_workers()) < len(procs):
+            if time.time() > deadline:
+                pytest.fail("Workers did not come up within 30s")
+            for port in procs:
+                pool.register("127.0.0.1", port)
+            time.sleep(0.2)
+        yield pool, procs
+    finally:
+        pool.stop()
+        for proc in procs.values():
+            proc.kill()
+            proc.wait()
+
+
+def _kill(procs, handle):
+    procs[handle.port].kill()
+    procs[handle.port].wait()
+
+
+def _record_outputs(pool, on_output=None):
+    """Wrap pool.execute to keep each node type's output."""
+    outputs = {}
+    execute = pool.execute
+
+    def recording_execute(node_type, *args, **kwargs):
+        output = execute(node_type, *args, **kwargs)
+        outputs[node_type] = output
+        if on_output:
+            on_output(node_type, output)
+        return output
+
+    pool.execute = recording_execute
+    return outputs
+
+
+def test_model_runs_on_worker_holding_train_data(cluster):
+    pool, _ = cluster
+    outputs = _record_outputs(pool)
+
+    result = run_pipeline(NODES, EDGES, EXECUTORS, coordinator=pool)
+
+    assert result["success"], result["error"]
+    assert result["results"]["eval"]["accuracy"] > 0.8
+    assert outputs["random_forest"]["model"].worker_id == outputs["train_test_split"]["train_data"].worker_id
+
+
+def test_retries_on_surviving_worker_after_kill(cluster):
+    pool, procs = cluster
+    killed = []
+
+    def kill_split_owner(node_type, output):
+        if node_type == "train_test_split":
+            handle = pool._owner(output["train_data"].worker_id)
+            killed.append(handle)
+            _kill(procs, handle)
+
+    outputs = _record_outputs(pool, kill_split_owner)
+
+    result = run_pipeline(NODES, EDGES, EXECUTORS, coordinator=pool)
+
+    assert result["success"], result["error"]
+    assert result["results"]["eval"]["accuracy"] > 0.8
+    survivor = pool.alive_workers()
+    assert len(survivor) == 1 and survivor[0] is not killed[0]
+    assert outputs["random_forest"]["model"].worker_id == survivor[0].worker_id
+
+
+def test_fetch_failure_does_not_mark_target_dead(cluster):
+    pool, procs = cluster
+    df = execute_sample_dataset({}, {"dataset_name": "iris"})["dataframe"]
+    split = pool.execute("train_test_split", {"dataframe": df}, {"target_column": "target"}, None, RUN_ID)
+    holder = pool._owner(split["train_data"].worker_id)
+    target = next(w for w in pool.alive_workers() if w is not holder)
+
+    # Train on the other worker so the evaluator's inputs live on both
+    holder.inflight += 10
+    try:
+        train_data = pool._fetch(split["train_data"], holder)
+        model = pool.execute("random_forest", {"train_data": train_data}, {"n_estimators": 10}, None, RUN_ID)
+        assert model["model"].worker_id == target.worker_id
+
+        _kill(procs, holder)
+        output = pool.execute(
+            "accuracy", {"model": model["model"], "test_data": split["test_data"]}, {}, None, RUN_ID
+        )
+    finally:
+        holder.inflight -= 10
+
+    assert output["metrics"]["accuracy"] > 0.8
+    assert not holder.alive
+    assert target.alive
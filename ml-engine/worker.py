@@ -0,0 +1,199 @@
+"""
+FlowML – Worker Engine
+A standalone process that executes single pipeline nodes on behalf of a
+coordinator (see coordinator.py). Heavy node outputs (dataframes, splits,
+models) stay in the worker's memory and are handed back as references, so a
+downstream node scheduled on the same worker never ships its data over the wire.
+
+Run one or more workers next to the ML engine:
+
+    FLOWML_WORKER_AUTHKEY=<secret> python worker.py --port 6001 --register http://localhost:5001
+
+Coordinator and workers exchange pickled objects, so both refuse to start
+without a shared FLOWML_WORKER_AUTHKEY.
+"""
+
+import os
+import hmac
+import json
+import uuid
+import hashlib
+import argparse
+import threading
+import urllib.request
+from multiprocessing.connection import Listener, AuthenticationError
+
+from executors import EXECUTORS
+
+# Output keys that are kept on the worker and returned as RemoteRefs
+HEAVY_OUTPUT_KEYS = {"dataframe", "train_data", "test_data", "model"}
+
+
+
+def worker_authkey():
+    """Shared secret for coordinator <-> worker connections. There is no default."""
+    authkey = os.environ.get("FLOWML_WORKER_AUTHKEY")
+    if not authkey:
+        raise RuntimeError(
+            "FLOWML_WORKER_AUTHKEY must be set to a shared secret to run a coordinator or worker"
+        )
+    return authkey.encode("utf-8")
+
+
+def registration_signature(host, port, authkey):
+    """HMAC a worker sends with /workers/register to prove it holds the authkey."""
+    return hmac.new(authkey, f"{host}:{int(port)}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class RemoteRef:
+    """Pointer to a node output value that lives in a worker's object store."""
+
+    def __init__(self, worker_id, task_id, key):
+        self.worker_id = worker_id
+        self.task_id = task_id
+        self.key = key
+
+    def __repr__(self):
+        return f"RemoteRef({self.worker_id}, {self.task_id}, {self.key})"
+
+
+class WorkerEngine:
+    """Executes node tasks and keeps their heavy outputs in a local store."""
+
+    def __init__(self, executors=None):
+        self.worker_id = uuid.uuid4().hex
+        self.executors = executors or EXECUTORS
+        self._store = {}  # (task_id, key) -> value
+        self._task_runs = {}  # task_id -> run_id
+        self._lock = threading.Lock()
+        self._active = 0
+
+    def handle(self, message):
+        op = message.get("op")
+        if op == "ping":
+            return {"ok": True, "worker_id": self.worker_id, "load": self._active, "stored": len(self._store)}
+        if op == "execute":
+            return self._execute(message)
+        if op == "fetch":
+            ref = message["ref"]
+            with self._lock:
+                if ref.worker_id != self.worker_id or (ref.task_id, ref.key) not in self._store:
+                    return {"ok": False, "error": f"Unknown reference: {ref}", "missing": True}
+                return {"ok": True, "value": self._store[(ref.task_id, ref.key)]}
+        if op == "release":
+            self._release(message["run_id"])
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    def _execute(self, message):
+        node_type = message["node_type"]
+        executor_fn = self.executors.get(node_type)
+        if executor_fn is None:
+            return {"ok": False, "error": f"No executor found for node type: {node_type}"}
+
+        inputs = {}
+        with self._lock:
+            for key, value in message["inputs"].items():
+                if isinstance(value, RemoteRef):
+                    if (value.task_id, value.key) not in self._store:
+                        return {"ok": False, "error": f"Unknown reference: {value}", "missing": True}
+                    value = self._store[(value.task_id, value.key)]
+                inputs[key] = value
+            self._active += 1
+
+        try:
+            output = executor_fn(inputs, message["config"], message["uploaded_files"], run_id=message["run_id"])
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        finally:
+            with self._lock:
+                self._active -= 1
+
+        task_id = message["task_id"]
+        result = {}
+        with self._lock:
+            self._task_runs[task_id] = message["run_id"]
+            for key, value in output.items():
+                if key in HEAVY_OUTPUT_KEYS:
+                    self._store[(task_id, key)] = value
+                    result[key] = RemoteRef(self.worker_id, task_id, key)
+                else:
+                    result[key] = value
+        return {"ok": True, "output": result}
+
+    def _release(self, run_id):
+        with self._lock:
+            task_ids = {t for t, r in self._task_runs.items() if r == run_id}
+            for store_key in [k for k in self._store if k[0] in task_ids]:
+                del self._store[store_key]
+            for task_id in task_ids:
+                del self._task_runs[task_id]
+
+
+def _serve_connection(engine, conn):
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            conn.send(engine.handle(message))
+    finally:
+        conn.close()
+
+
+def serve(host="127.0.0.1", port=6001, authkey=None, engine=None):
+    """Accept coordinator connections forever, one thread per connection."""
+    engine = engine or WorkerEngine()
+    listener = Listener((host, port), authkey=authkey or worker_authkey())
+    print(f"FlowML worker {engine.worker_id} listening on {host}:{port}")
+    while True:
+        try:
+            conn = listener.accept()
+        except (AuthenticationError, EOFError, OSError):
+            # Failed handshake or a bare reachability probe
+            continue
+        threading.Thread(target=_serve_connection, args=(engine, conn), daemon=True).start()
+
+
+def register_with_coordinator(coordinator_url, host, port, authkey=None):
+    """Announce this worker to a coordinator engine's /workers/register route."""
+    body = json.dumps({"host": host, "port": port}).encode("utf-8")
+    request = urllib.request.Request(
+        f"{coordinator_url.rstrip('/')}/workers/register",
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-Worker-Signature": registration_signature(host, port, authkey or worker_authkey())
+        },
+        method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FlowML worker engine")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6001)
+    parser.add_argument("--advertise-host", default=None,
+                        help="Host the coordinator should connect to (defaults to --host)")
+    parser.add_argument("--register", default=None,
+                        help="Coordinator base URL to register with, e.g. http://localhost:5001")
+    args = parser.parse_args()
+
+    if not os.environ.get("FLOWML_WORKER_AUTHKEY"):
+        parser.error("FLOWML_WORKER_AUTHKEY must be set to the secret shared with the coordinator")
+
+    # Import ourselves by module name so pickled RemoteRefs resolve to
+    # `worker.RemoteRef` on the coordinator side, not `__main__.RemoteRef`.
+    import worker
+
+    if args.register:
+        # Register once the listener is up
+        advertise_host = args.advertise_host or args.host
+        threading.Timer(
+            0.5, worker.register_with_coordinator, args=(args.register, advertise_host, args.port)
+        ).start()
+
+    worker.serve(host=args.host, port=args.port)